@@ -9,7 +9,8 @@ from alembic import context
 
 from app.config import settings
 from app.database import Base
-from app.models import Catalog, Product  # noqa: F401
+from app.models import Catalog, CatalogStats, Product  # noqa: F401
+from app.models.search import SEARCH_OBJECT_NAMES
 
 config = context.config
 
@@ -21,11 +22,17 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # full-text search structures are created by DDL, not declared on the models
+    return not (reflected and compare_to is None and name in SEARCH_OBJECT_NAMES)
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -35,7 +42,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_object=include_object
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,52 @@
+"""add catalog stats
+
+Revision ID: 1f24816e5826
+Revises: e7b4bc48fa4a
+Create Date: 2026-10-18 12:21:06.538914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '1f24816e5826'
+down_revision: Union[str, None] = 'e7b4bc48fa4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_stats',
+        sa.Column('catalog_id', sa.Integer(), nullable=False),
+        sa.Column('product_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_units', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('inventory_value', sa.Float(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['catalog_id'], ['catalogs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('catalog_id'),
+    )
+    # every existing catalog gets its row, computed from its products
+    op.execute(
+        "INSERT INTO catalog_stats (catalog_id, product_count, total_units, inventory_value) "
+        "SELECT catalogs.id, count(products.id), coalesce(sum(products.quantity), 0), "
+        "coalesce(sum(products.price * products.quantity), 0) "
+        "FROM catalogs LEFT OUTER JOIN products ON products.catalog_id = catalogs.id "
+        "GROUP BY catalogs.id"
+    )
+    op.create_index(
+        'ix_catalog_stats_product_count', 'catalog_stats', ['product_count', 'catalog_id']
+    )
+    op.create_index('ix_catalog_stats_total_units', 'catalog_stats', ['total_units', 'catalog_id'])
+    op.create_index(
+        'ix_catalog_stats_inventory_value', 'catalog_stats', ['inventory_value', 'catalog_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_catalog_stats_inventory_value', table_name='catalog_stats')
+    op.drop_index('ix_catalog_stats_total_units', table_name='catalog_stats')
+    op.drop_index('ix_catalog_stats_product_count', table_name='catalog_stats')
+    op.drop_table('catalog_stats')
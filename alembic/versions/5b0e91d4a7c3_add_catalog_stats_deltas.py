@@ -0,0 +1,47 @@
+"""add catalog stats deltas
+
+Revision ID: 5b0e91d4a7c3
+Revises: c8ad650a131c
+Create Date: 2026-10-18 16:02:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e91d4a7c3'
+down_revision: Union[str, None] = 'c8ad650a131c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_stats_deltas',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('catalog_id', sa.Integer(), nullable=False),
+        sa.Column('product_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_units', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('inventory_value', sa.Float(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['catalog_id'], ['catalogs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_catalog_stats_deltas_catalog_id', 'catalog_stats_deltas', ['catalog_id'])
+
+
+def downgrade() -> None:
+    # fold what was not rolled up yet into the stats, which the old code updates directly
+    op.execute(
+        "UPDATE catalog_stats SET "
+        "product_count = catalog_stats.product_count + deltas.product_count, "
+        "total_units = catalog_stats.total_units + deltas.total_units, "
+        "inventory_value = catalog_stats.inventory_value + deltas.inventory_value "
+        "FROM (SELECT catalog_id, sum(product_count) AS product_count, "
+        "sum(total_units) AS total_units, sum(inventory_value) AS inventory_value "
+        "FROM catalog_stats_deltas GROUP BY catalog_id) AS deltas "
+        "WHERE catalog_stats.catalog_id = deltas.catalog_id"
+    )
+    op.drop_index('ix_catalog_stats_deltas_catalog_id', table_name='catalog_stats_deltas')
+    op.drop_table('catalog_stats_deltas')
@@ -0,0 +1,116 @@
+"""add product full-text search
+
+Revision ID: 82c70aff821b
+Revises: 3763c8fecc0c
+Create Date: 2026-10-18 09:52:11.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '82c70aff821b'
+down_revision: Union[str, None] = '3763c8fecc0c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+
+
+def _backfill_search_vector() -> None:
+    # one short transaction per batch of ids, so no batch holds row locks for long
+    statement = sa.text(
+        "WITH batch AS (SELECT id FROM products WHERE id > :after ORDER BY id LIMIT :size), "
+        "updated AS (UPDATE products SET search_vector = "
+        + SEARCH_VECTOR.format(row='products.')
+        + " FROM batch WHERE products.id = batch.id RETURNING products.id) "
+        "SELECT max(id) FROM updated"
+    )
+    after = 0
+    while after is not None:
+        parameters = {'after': after, 'size': BACKFILL_BATCH_SIZE}
+        after = op.get_bind().execute(statement, parameters).scalar()
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # a nullable column without a default is added without rewriting the table
+        op.add_column('products', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        # rows written from here on get their vector from the trigger, older ones from the backfill
+        op.execute(
+            "CREATE FUNCTION products_search_vector_update() RETURNS trigger "
+            "LANGUAGE plpgsql AS $$ BEGIN NEW.search_vector := "
+            + SEARCH_VECTOR.format(row='NEW.')
+            + "; RETURN NEW; END $$"
+        )
+        op.execute(
+            "CREATE TRIGGER products_search_vector "
+            "BEFORE INSERT OR UPDATE OF name, description ON products "
+            "FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()"
+        )
+        with op.get_context().autocommit_block():
+            if op.get_context().as_sql:
+                # offline SQL cannot loop over the batches: fill every row at once
+                op.execute("UPDATE products SET search_vector = " + SEARCH_VECTOR.format(row=''))
+            else:
+                _backfill_search_vector()
+            # build without blocking writes to products
+            op.create_index(
+                'ix_products_search_vector',
+                'products',
+                ['search_vector'],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "name, description, content='products', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_au AFTER UPDATE OF name, description ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); "
+            "INSERT INTO products_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); END"
+        )
+        # index the rows that already exist
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_products_search_vector', table_name='products', postgresql_concurrently=True
+            )
+        op.execute("DROP TRIGGER IF EXISTS products_search_vector ON products")
+        op.execute("DROP FUNCTION IF EXISTS products_search_vector_update()")
+        op.drop_column('products', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
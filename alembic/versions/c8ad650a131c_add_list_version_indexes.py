@@ -0,0 +1,37 @@
+"""add list version indexes
+
+Revision ID: c8ad650a131c
+Revises: 1f24816e5826
+Create Date: 2026-10-18 10:24:51.209331
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8ad650a131c'
+down_revision: Union[str, None] = '1f24816e5826'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# max(updated_at) of a list, read off the end of an index instead of a table scan
+VERSION_INDEXES = [
+    ('ix_products_updated_at', 'products', ['updated_at']),
+    ('ix_products_catalog_id_updated_at', 'products', ['catalog_id', 'updated_at']),
+    ('ix_catalogs_updated_at', 'catalogs', ['updated_at']),
+]
+
+
+def upgrade() -> None:
+    # build without blocking writes to the tables on PostgreSQL
+    with op.get_context().autocommit_block():
+        for name, table, columns in VERSION_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in VERSION_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
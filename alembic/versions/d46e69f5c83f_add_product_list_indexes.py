@@ -0,0 +1,77 @@
+"""add product list filter and sort indexes
+
+Revision ID: d46e69f5c83f
+Revises: 82c70aff821b
+Create Date: 2026-10-18 10:14:37.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd46e69f5c83f'
+down_revision: Union[str, None] = '82c70aff821b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_INDEXES = [
+    ('ix_products_created_at_id', ['created_at', 'id']),
+    ('ix_products_price_id', ['price', 'id']),
+    ('ix_products_name_id', ['name', 'id']),
+    ('ix_products_quantity_id', ['quantity', 'id']),
+    ('ix_products_catalog_id_created_at_id', ['catalog_id', 'created_at', 'id']),
+    ('ix_products_catalog_id_price_id', ['catalog_id', 'price', 'id']),
+    ('ix_products_catalog_id_name_id', ['catalog_id', 'name', 'id']),
+    ('ix_products_catalog_id_quantity_id', ['catalog_id', 'quantity', 'id']),
+]
+IN_STOCK_INDEXES = [
+    ('ix_products_in_stock_created_at_id', ['created_at', 'id']),
+    ('ix_products_in_stock_catalog_id_created_at_id', ['catalog_id', 'created_at', 'id']),
+]
+# superseded by the composite indexes that lead with the same column
+REPLACED_INDEXES = [
+    ('ix_products_name', ['name']),
+    ('ix_products_catalog_id', ['catalog_id']),
+]
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    # build without blocking writes to the table on PostgreSQL
+    with op.get_context().autocommit_block():
+        for name, columns in SORT_INDEXES:
+            op.create_index(name, 'products', columns, postgresql_concurrently=True)
+        for name, columns in IN_STOCK_INDEXES:
+            op.create_index(
+                name,
+                'products',
+                columns,
+                postgresql_where=sa.text('quantity > 0'),
+                sqlite_where=sa.text('quantity > 0'),
+                postgresql_concurrently=True,
+            )
+        if is_postgresql:
+            op.create_index(
+                'ix_products_name_pattern',
+                'products',
+                ['name'],
+                postgresql_ops={'name': 'varchar_pattern_ops'},
+                postgresql_concurrently=True,
+            )
+        for name, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name='products', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        for name, columns in REPLACED_INDEXES:
+            op.create_index(name, 'products', columns, postgresql_concurrently=True)
+        if is_postgresql:
+            op.drop_index(
+                'ix_products_name_pattern', table_name='products', postgresql_concurrently=True
+            )
+        for name, _ in SORT_INDEXES + IN_STOCK_INDEXES:
+            op.drop_index(name, table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,34 @@
+"""add catalog list index
+
+Revision ID: e7b4bc48fa4a
+Revises: d46e69f5c83f
+Create Date: 2026-10-18 11:02:51.447120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4bc48fa4a'
+down_revision: Union[str, None] = 'd46e69f5c83f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # build without blocking writes to the table on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_catalogs_created_at_id',
+            'catalogs',
+            ['created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_catalogs_created_at_id', table_name='catalogs', postgresql_concurrently=True
+        )
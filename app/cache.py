@@ -0,0 +1,212 @@
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+from fastapi import Depends
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import after_commit, get_db, get_read_db, is_replica_session
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+    bytes: int
+    max_bytes: int
+
+
+class CacheBackend(Protocol):
+    def get(self, key: Hashable) -> Optional[Any]: ...
+
+    def set(self, key: Hashable, value: Any) -> None: ...
+
+    def delete(self, key: Hashable) -> None: ...
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> CacheStats: ...
+
+
+def approximate_size(value: Any) -> int:
+    """Bytes a cached value takes, approximated by its JSON for models (text fields dominate)."""
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """In-process cache bounded to ``maxsize`` entries, each expiring ``ttl`` seconds after set.
+
+    With ``max_bytes``, the approximate size of the values is bounded too. The least recently
+    used entries are evicted once either bound is exceeded.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_bytes: int = 0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        # key -> (expires at, value, approximate size)
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = approximate_size(value) if self.max_bytes else 0
+        self._remove(key)
+        self._data[key] = (time.monotonic() + self.ttl, value, size)
+        self._bytes += size
+        while len(self._data) > self.maxsize or (self.max_bytes and self._bytes > self.max_bytes):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._remove(key)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        keys = [key for key, (_, value, _) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._data),
+            maxsize=self.maxsize,
+            bytes=self._bytes,
+            max_bytes=self.max_bytes,
+        )
+
+
+class InvalidateOnCommit:
+    """A view of ``cache`` whose deletes wait until the session's transaction has committed.
+
+    Dropping an entry before the COMMIT lets a concurrent read cache the row as it still is
+    for the full TTL. A rolled back transaction drops nothing.
+    """
+
+    def __init__(self, cache: CacheBackend, session: AsyncSession) -> None:
+        self.cache = cache
+        self.session = session
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.cache.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.cache.set(key, value)
+
+    def delete(self, key: Hashable) -> None:
+        after_commit(self.session, lambda: self.cache.delete(key))
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        # nothing is removed yet, so there is nothing to count
+        after_commit(self.session, lambda: self.cache.delete_where(predicate))
+        return 0
+
+    def clear(self) -> None:
+        after_commit(self.session, self.cache.clear)
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+
+class ReplicaReadCache:
+    """A view of ``cache`` for reads served by a replica: they look entries up but store none.
+
+    A lagging replica can still return a row that a committed write has just invalidated,
+    and storing it would serve it for the full TTL.
+    """
+
+    def __init__(self, cache: CacheBackend) -> None:
+        self.cache = cache
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.cache.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+
+    def delete(self, key: Hashable) -> None:
+        self.cache.delete(key)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        return self.cache.delete_where(predicate)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+
+def product_key(product_id: int) -> tuple[str, int]:
+    return ("product", product_id)
+
+
+def catalog_key(catalog_id: int) -> tuple[str, int]:
+    return ("catalog", catalog_id)
+
+
+count_cache = LRUCache(maxsize=1024, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+entity_cache = LRUCache(
+    maxsize=settings.ENTITY_CACHE_MAX_ENTRIES,
+    ttl=settings.ENTITY_CACHE_TTL_SECONDS,
+    max_bytes=settings.ENTITY_CACHE_MAX_BYTES,
+)
+
+
+def get_entity_cache() -> Optional[CacheBackend]:
+    return entity_cache if settings.ENTITY_CACHE_ENABLED else None
+
+
+def get_invalidating_cache(
+    session: AsyncSession = Depends(get_db),
+) -> Optional[CacheBackend]:
+    """The entity cache for write routes, invalidated only once their changes are committed."""
+    cache = get_entity_cache()
+    return cache and InvalidateOnCommit(cache, session)
+
+
+def get_read_cache(session: AsyncSession = Depends(get_read_db)) -> Optional[CacheBackend]:
+    """The entity cache for read routes, only filled by reads from the primary."""
+    cache = get_entity_cache()
+    if cache is not None and is_replica_session(session):
+        return ReplicaReadCache(cache)
+    return cache
@@ -0,0 +1,49 @@
+"""Recompute catalog statistics from the products table, repairing any drift.
+
+Run from the repository root::
+
+    python -m app.commands.rebuild_catalog_stats [--catalog-id ID]
+"""
+
+import argparse
+import asyncio
+from typing import Optional
+
+from app.database import AsyncSessionLocal, engine
+from app.exceptions import NotFoundError
+from app.logging_config import configure_logging, stop_logging
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.services.catalog import RebuildCatalogStats
+
+
+async def rebuild(catalog_id: Optional[int] = None) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            service = RebuildCatalogStats(
+                CatalogRepository(session), CatalogStatsRepository(session)
+            )
+            rebuilt = await service.execute(catalog_id)
+            await session.commit()
+        return rebuilt
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog-id", type=int, help="rebuild one catalog instead of all")
+    args = parser.parse_args()
+
+    configure_logging()
+    try:
+        rebuilt = asyncio.run(rebuild(args.catalog_id))
+    except NotFoundError as exc:
+        parser.exit(1, f"{exc.detail}\n")
+    finally:
+        stop_logging()
+    print(f"Rebuilt stats of {rebuilt} catalogs")
+
+
+if __name__ == "__main__":
+    main()
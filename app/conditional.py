@@ -0,0 +1,83 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def _as_utc(value: datetime) -> datetime:
+    # timestamps are stored without a zone and written by the database in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def matches(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return _as_utc(self.last_modified) <= _as_utc(since)
+        return False
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(_as_utc(self.last_modified), usegmt=True)
+        return headers
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers())
+
+
+def _make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def entity_validators(
+    resource: str, entity_id: int, updated_at: datetime, fields: Optional[tuple[str, ...]] = None
+) -> Validators:
+    parts: list[Any] = [resource, entity_id, updated_at.isoformat()]
+    if fields:
+        # each sparse fieldset is a different representation of the entity
+        parts.append(fields)
+    return Validators(etag=_make_etag(*parts), last_modified=updated_at)
+
+
+def list_validators(
+    request: Request, resource: str, last_modified: Optional[datetime], count: int
+) -> Validators:
+    """Build an ETag for a list page from the collection's max(updated_at) and row count.
+
+    The query string is part of the tag so that every page and filter gets its own ETag.
+    Lists carry no Last-Modified: deleting a row removes it from the page without moving
+    max(updated_at), so only the tag, which also covers the count, can tell.
+
+    The tag is weak in one more way. An in-place update that commits with an ``updated_at``
+    no later than the current maximum leaves it unchanged. That happens when a transaction
+    started before the latest write committed, because PostgreSQL's ``now()`` is the start
+    of the transaction. It also happens within the same second on SQLite, whose timestamps
+    have one-second resolution. Until the next write moves max(updated_at) or the count,
+    revalidating clients get 304 for the stale page. There is no counter to fold in instead:
+    products outside a catalog have no ``catalog_stats`` row, and quantity adjustments only
+    reach that row at the next roll-up.
+    """
+    query = sorted(request.query_params.multi_items())
+    return Validators(
+        etag=_make_etag(resource, query, last_modified and last_modified.isoformat(), count)
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,12 +10,47 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/webellian_db"
+    DATABASE_READ_URL: str = ""
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    READ_YOUR_WRITES_SECONDS: float = 0.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    SLOW_QUERY_THRESHOLD_SECONDS: float = 0.5
 
     APP_NAME: str = "Webellian Shop Inventory"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
 
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+
     API_V1_PREFIX: str = "/api/v1"
 
+    COUNT_CACHE_TTL_SECONDS: float = 30.0
+    BULK_INSERT_BATCH_SIZE: int = 5000
+    EXPORT_CHUNK_SIZE: int = 1000
+    CATALOG_DELETE_CHUNK_SIZE: int = 5000
+
+    ENTITY_CACHE_ENABLED: bool = True
+    ENTITY_CACHE_MAX_ENTRIES: int = 10000
+    # approximate, from the JSON size of the cached entities; descriptions are unbounded text
+    ENTITY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ENTITY_CACHE_TTL_SECONDS: float = 60.0
+
+    WRITE_BUFFER_ENABLED: bool = False
+    WRITE_BUFFER_FLUSH_INTERVAL_SECONDS: float = 0.05
+    WRITE_BUFFER_MAX_PENDING: int = 1000
+    WRITE_BUFFER_DURABILITY: Literal["flush", "buffer"] = "flush"
+    WRITE_BUFFER_MAX_QUEUED: int = 10000
+    WRITE_BUFFER_MAX_ATTEMPTS: int = 5
+    CATALOG_STATS_ROLLUP_INTERVAL_SECONDS: float = 1.0
+    CATALOG_STATS_ROLLUP_BATCH_SIZE: int = 10000
+
 
 settings = Settings()
@@ -1,17 +1,155 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncGenerator, Optional
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
+
+def enable_sqlite_foreign_keys(async_engine: AsyncEngine) -> None:
+    """SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked per connection."""
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_foreign_keys(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+@dataclass
+class QueryStats:
+    route: str = ""
+    count: int = 0
+    seconds: float = 0.0
+    # only filled when asked for: keeping every statement's text costs memory on each request
+    record_statements: bool = False
+    statements: list[str] = field(default_factory=list)
+
+
+# Every active tracking scope receives each statement, so a test budget wrapped around a
+# request still sees the queries the per-request middleware counts.
+_active_query_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "active_query_stats", default=()
 )
 
+
+@contextmanager
+def track_queries(route: str = "", record_statements: bool = False) -> Iterator[QueryStats]:
+    """Count the statements executed, and the time spent in them, within this block.
+
+    With ``record_statements`` the SQL text of each statement is kept in ``statements`` too.
+    """
+    stats = QueryStats(route=route, record_statements=record_statements)
+    token = _active_query_stats.set(_active_query_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_query_stats.reset(token)
+
+
+def instrument_queries(async_engine: AsyncEngine) -> None:
+    """Feed statements run on the engine into the active ``track_queries`` scopes and log slow ones."""
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(connection: Any, *_args: Any) -> None:
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(connection: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        elapsed = time.perf_counter() - connection.info["query_started"].pop()
+        active = _active_query_stats.get()
+        for stats in active:
+            stats.count += 1
+            stats.seconds += elapsed
+            if stats.record_statements:
+                stats.statements.append(statement)
+
+        if elapsed >= settings.SLOW_QUERY_THRESHOLD_SECONDS:
+            route = active[-1].route if active else "<no request>"
+            logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, statement)
+
+    @event.listens_for(async_engine.sync_engine, "handle_error")
+    def _handle_error(context: Any) -> None:
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+@dataclass
+class PoolWaitStats:
+    waits: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection and how often they time out."""
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_wait_stats.timeouts += 1
+            raise
+        finally:
+            pool_wait_stats.record(time.perf_counter() - started)
+
+
+def _engine_options(database_url: str) -> dict[str, Any]:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {"echo": False}
+
+    options: dict[str, Any] = {
+        "echo": False,
+        "poolclass": MonitoredQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+instrument_queries(engine)
+
+if engine.dialect.name == "sqlite":
+    enable_sqlite_foreign_keys(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -31,5 +169,184 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+_AFTER_COMMIT = "after_commit"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Any]) -> None:
+    """Run ``callback`` once the session's transaction has committed; a rollback drops it."""
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
+
+
+def read_only_sessionmaker(
+    async_engine: AsyncEngine, info: Optional[dict[str, Any]] = None
+) -> async_sessionmaker[AsyncSession]:
+    """Sessions for pure reads, never committed or rolled back.
+
+    On PostgreSQL their connections run in autocommit, which asyncpg switches to without a
+    round-trip and which saves the BEGIN and COMMIT around every read. SQLite opens no
+    transaction for a SELECT to begin with, and changing its isolation level per checkout
+    costs more than it saves.
+    """
+    if async_engine.dialect.name == "postgresql":
+        async_engine = async_engine.execution_options(isolation_level="AUTOCOMMIT")
+    return async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info=info,
+    )
+
+
+ReadOnlySessionLocal = read_only_sessionmaker(engine)
+
+
+_REPLICA = "replica"
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    return session.info.get(_REPLICA, False)
+
+
+class ReadReplicas:
+    """Hands out replica sessions round-robin, skipping replicas that recently failed to connect."""
+
+    def __init__(self, urls: list[str], retry_after: float) -> None:
+        self.engines = [create_async_engine(url, **_engine_options(url)) for url in urls]
+        for replica in self.engines:
+            instrument_queries(replica)
+        self.sessionmakers = [
+            read_only_sessionmaker(replica, info={_REPLICA: True}) for replica in self.engines
+        ]
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(self.engines)
+        self._next = 0
+
+    async def open_session(self) -> Optional[AsyncSession]:
+        """Return a session already connected to a replica, or None if none is reachable."""
+        start = self._next
+        self._next = (start + 1) % len(self.sessionmakers)
+        for offset in range(len(self.sessionmakers)):
+            index = (start + offset) % len(self.sessionmakers)
+            if self._down_until[index] > time.monotonic():
+                continue
+            session = self.sessionmakers[index]()
+            try:
+                # connect now, while falling back is still possible
+                await session.connection()
+            except (OSError, exc.DBAPIError, exc.TimeoutError) as error:
+                await session.close()
+                self._down_until[index] = time.monotonic() + self.retry_after
+                logger.warning(
+                    "Read replica %s unavailable, skipping it for %ss: %s",
+                    index,
+                    self.retry_after,
+                    error,
+                )
+                continue
+            return session
+        return None
+
+
+read_replicas = (
+    ReadReplicas(
+        [url.strip() for url in settings.DATABASE_READ_URL.split(",") if url.strip()],
+        settings.DB_REPLICA_RETRY_SECONDS,
+    )
+    if settings.DATABASE_READ_URL.strip()
+    else None
+)
+
+# set on responses to writes; reads carrying it go to the primary until it expires
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+
+
+def reads_own_writes(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Autocommit session for read-only requests, on a healthy read replica if configured.
+
+    Nothing is committed or rolled back: the session is only closed, returning its connection.
+    """
+    session = None
+    if read_replicas is not None and not reads_own_writes(request):
+        session = await read_replicas.open_session()
+    async with session or ReadOnlySessionLocal() as read_session:
+        yield read_session
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write, pins the client's reads to the primary for a while.
+
+    Opt-in through ``READ_YOUR_WRITES_SECONDS``, so a client never reads its own change back
+    from a replica that has not replayed it yet.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS") or window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def get_pool_status() -> dict[str, Any]:
+    status: dict[str, Any] = {"class": type(engine.pool).__name__}
+    if isinstance(engine.pool, QueuePool):
+        status.update(
+            size=engine.pool.size(),
+            checked_out=engine.pool.checkedout(),
+            checked_in=engine.pool.checkedin(),
+            overflow=max(engine.pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    status.update(asdict(pool_wait_stats))
+    return status
+
+
+async def estimate_row_count(session: AsyncSession, table_name: str) -> Optional[int]:
+    """Return the planner's row estimate for a table, or None if the backend has none."""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    estimate = result.scalar()
+    # reltuples is -1 until the table has been vacuumed or analyzed at least once
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
 class Base(DeclarativeBase):
     pass
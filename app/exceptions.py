@@ -1,4 +1,16 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Optional
+import logging
+
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL SQLSTATE codes; SQLite only reports the kind of constraint in its message
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
 
 
 class NotFoundError(HTTPException):
@@ -12,3 +24,37 @@ class NotFoundError(HTTPException):
 class ConflictError(HTTPException):
     def __init__(self, message: str) -> None:
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=message)
+
+
+class BadRequestError(HTTPException):
+    def __init__(self, message: str) -> None:
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+def _violated(error: IntegrityError, sqlstate: str, sqlite_message: str) -> bool:
+    return getattr(error.orig, "sqlstate", None) == sqlstate or sqlite_message in str(error.orig)
+
+
+@contextmanager
+def translate_integrity_errors(
+    foreign_key: Optional[Callable[[], HTTPException]] = None,
+    unique: Optional[Callable[[], HTTPException]] = None,
+) -> Iterator[None]:
+    """Raise the error built by ``foreign_key`` or ``unique`` for that constraint violation.
+
+    Lets writes rely on the database constraints instead of checking with a SELECT first.
+    The failed statement aborts the transaction, so the error must end the request.
+    """
+    try:
+        yield
+    except IntegrityError as error:
+        if foreign_key is not None and _violated(
+            error, FOREIGN_KEY_VIOLATION, "FOREIGN KEY constraint failed"
+        ):
+            translated = foreign_key()
+        elif unique is not None and _violated(error, UNIQUE_VIOLATION, "UNIQUE constraint failed"):
+            translated = unique()
+        else:
+            raise
+        logger.warning("%s", translated.detail)
+        raise translated from error
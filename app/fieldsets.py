@@ -0,0 +1,88 @@
+from functools import lru_cache
+from collections.abc import Sequence
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field, create_model
+from sqlalchemy import Column, Table
+
+from app.exceptions import BadRequestError
+from app.schemas.base import BaseSchema
+
+# Always selected: lists order and build cursors on (created_at, id), and detail ETags are
+# built from (id, updated_at). When not requested they are loaded but left out of the JSON,
+# as are the ``extra_keys`` a caller needs, such as the column a list is sorted by.
+KEY_FIELDS = ("id", "created_at", "updated_at")
+
+Fields = tuple[str, ...]
+
+
+def parse_fields(value: Optional[str], model: type[BaseModel]) -> Optional[Fields]:
+    """Parse a ``fields=a,b`` query value into field names in ``model`` declaration order."""
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise BadRequestError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in model.model_fields if name in requested) or None
+
+
+def parse_include(value: Optional[str], allowed: Sequence[str]) -> Fields:
+    """Parse an ``include=a,b`` query value into the related data to embed, in ``allowed`` order."""
+    if not value:
+        return ()
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise BadRequestError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
+
+
+@lru_cache(maxsize=256)
+def partial_model(
+    model: type[BaseModel], fields: Fields, extra_keys: Fields = ()
+) -> type[BaseModel]:
+    """Build (once per field set) a model with only ``fields`` of ``model``, plus hidden keys."""
+    definitions: dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        if name in fields:
+            definitions[name] = (field.annotation, field)
+        elif name in KEY_FIELDS or name in extra_keys:
+            definitions[name] = (field.annotation, Field(exclude=True))
+    return create_model(f"{model.__name__}[{','.join(fields)}]", __base__=BaseSchema, **definitions)
+
+
+@lru_cache(maxsize=256)
+def partial_list_model(list_model: type[BaseModel], item_model: type[BaseModel]) -> type[BaseModel]:
+    return create_model(
+        f"{list_model.__name__}[{item_model.__name__}]",
+        __base__=list_model,
+        items=(List[item_model], ...),  # type: ignore[valid-type]
+    )
+
+
+def response_model(
+    model: type[BaseModel], fields: Optional[Fields], extra_keys: Fields = ()
+) -> type[BaseModel]:
+    return partial_model(model, fields, extra_keys) if fields else model
+
+
+def list_response_model(
+    list_model: type[BaseModel],
+    item_model: type[BaseModel],
+    fields: Optional[Fields],
+    extra_keys: Fields = (),
+) -> type[BaseModel]:
+    if not fields:
+        return list_model
+    return partial_list_model(list_model, partial_model(item_model, fields, extra_keys))
+
+
+def selected_columns(
+    table: Table, fields: Optional[Fields], extra_keys: Fields = ()
+) -> list[Column[Any]]:
+    """Columns to SELECT for ``fields``: all of them when unset, otherwise fields plus keys."""
+    if not fields:
+        return list(table.columns)
+    wanted = set(fields) | set(KEY_FIELDS) | set(extra_keys)
+    return [column for column in table.columns if column.key in wanted]
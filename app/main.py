@@ -1,27 +1,77 @@
+import time
 from typing import Any
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager, suppress
 from collections.abc import AsyncIterator
+from dataclasses import asdict
+import asyncio
 import logging
 
+from app.cache import count_cache, entity_cache, get_invalidating_cache
 from app.config import settings
+from app.database import AsyncSessionLocal, ReadYourWritesMiddleware, get_db, get_pool_status
+from app.logging_config import configure_logging
+from app.metrics import MetricsMiddleware, QueryStatsMiddleware, registry
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.repositories.product_repository import ProductRepository
 from app.routers import catalogs, products
 from app.models import Catalog, Product  # noqa: F401
+from app.services.catalog import RollUpCatalogStats
+from app.services.product import FlushQuantityAdjustments
+from app.write_buffer import AdjustmentOutcome, Batch, quantity_buffer
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
+async def flush_quantity_adjustments(batch: Batch) -> dict[int, list[AdjustmentOutcome]]:
+    async with AsyncSessionLocal() as session, session.begin():
+        service = FlushQuantityAdjustments(
+            ProductRepository(session),
+            CatalogStatsRepository(session),
+            get_invalidating_cache(session),
+        )
+        return await service.execute(batch)
+
+
+async def roll_up_catalog_stats() -> int:
+    async with AsyncSessionLocal() as session, session.begin():
+        return await RollUpCatalogStats(CatalogStatsRepository(session)).execute()
+
+
+async def roll_up_catalog_stats_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.CATALOG_STATS_ROLLUP_INTERVAL_SECONDS)
+        try:
+            # a full batch means more are waiting: keep going until the backlog is drained
+            while await roll_up_catalog_stats() >= settings.CATALOG_STATS_ROLLUP_BATCH_SIZE:
+                pass
+        except Exception:
+            logger.exception("Rolling up catalog stats failed")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Starting application...")
+    if settings.WRITE_BUFFER_ENABLED:
+        quantity_buffer.start(flush_quantity_adjustments)
+    roll_up = asyncio.create_task(roll_up_catalog_stats_periodically())
     yield
     logger.info("Shutting down application...")
+    await quantity_buffer.close()
+    roll_up.cancel()
+    with suppress(asyncio.CancelledError):
+        await roll_up
+    # fold in what the buffer's last flush recorded
+    try:
+        await roll_up_catalog_stats()
+    except Exception:
+        logger.exception("Rolling up catalog stats failed")
 
 
 app = FastAPI(
@@ -38,6 +88,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError) -> JSONResponse:
+    logger.warning("Database connection pool timeout on %s: %s", request.url.path, error)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database connection pool exhausted, retry later"},
+    )
+
 
 app.include_router(catalogs.router, prefix=settings.API_V1_PREFIX, tags=["catalogs"])
 app.include_router(products.router, prefix=settings.API_V1_PREFIX, tags=["products"])
@@ -55,3 +118,44 @@ async def root() -> dict[str, Any]:
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+async def readiness_check(session: AsyncSession = Depends(get_db)) -> JSONResponse:
+    started = time.perf_counter()
+    try:
+        await session.execute(text("SELECT 1"))
+    except Exception as error:
+        logger.warning("Readiness check failed: %s", error)
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "unavailable",
+                "database": {"status": "error", "error": str(error)},
+                "pool": get_pool_status(),
+            },
+        )
+
+    return JSONResponse(
+        content={
+            "status": "ready",
+            "database": {
+                "status": "ok",
+                "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            },
+            "pool": get_pool_status(),
+        }
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> dict[str, dict[str, int]]:
+    return {
+        "entity": asdict(entity_cache.stats()),
+        "count": asdict(count_cache.stats()),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,211 @@
+import functools
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import count_cache, entity_cache
+from app.config import settings
+from app.database import get_pool_status, track_queries
+from app.write_buffer import quantity_buffer
+
+registry = CollectorRegistry()
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method"],
+    registry=registry,
+)
+DB_DURATION = Histogram(
+    "db_operation_duration_seconds",
+    "Time spent in repository methods, including database round-trips",
+    ["operation"],
+    registry=registry,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Label children are bound once per label combination and reused, so the hot path is a
+# dict lookup plus observe() instead of a labels() call per request.
+_request_children: dict[tuple[str, str, int], Any] = {}
+_in_progress_children: dict[str, Any] = {}
+
+
+def _request_child(method: str, route: str, status_code: int) -> Any:
+    key = (method, route, status_code)
+    child = _request_children.get(key)
+    if child is None:
+        child = _request_children[key] = REQUEST_DURATION.labels(method, route, str(status_code))
+    return child
+
+
+def _in_progress_child(method: str) -> Any:
+    child = _in_progress_children.get(method)
+    if child is None:
+        child = _in_progress_children[method] = REQUESTS_IN_PROGRESS.labels(method)
+    return child
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = _in_progress_child(method)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            _request_child(method, route_path, status_code).observe(elapsed)
+
+
+class QueryStatsMiddleware:
+    """Counts and times the SQL statements each request runs, for the slow-query log and debug
+    headers; their text is not kept.
+
+    With ``DEBUG`` enabled, responses carry ``X-DB-Queries`` and ``X-DB-Time`` (milliseconds)
+    covering the statements executed before the response headers were sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+
+            async def send_with_query_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{stats.seconds * 1000:.3f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_query_stats)
+
+
+T = TypeVar("T")
+
+
+def instrument_repository(cls: type[T]) -> type[T]:
+    """Time every public coroutine method of a repository class as ``Class.method``."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _timed(method, DB_DURATION.labels(f"{cls.__name__}.{name}")))
+    return cls
+
+
+def _timed(method: Callable[..., Any], histogram: Any) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class _RuntimeStatsCollector(Collector):
+    """Exposes cache, connection pool and write buffer counters, read when the endpoint is scraped."""
+
+    def collect(self) -> Iterator[Any]:
+        cache_counters = {
+            field: CounterMetricFamily(f"cache_{field}", f"Cache {field}", labels=["cache"])
+            for field in ("hits", "misses", "evictions")
+        }
+        cache_entries = GaugeMetricFamily("cache_entries", "Cached entries", labels=["cache"])
+        cache_bytes = GaugeMetricFamily(
+            "cache_bytes", "Approximate size of the cached values", labels=["cache"]
+        )
+        for cache_name, cache in (("entity", entity_cache), ("count", count_cache)):
+            stats = cache.stats()
+            for field, family in cache_counters.items():
+                family.add_metric([cache_name], getattr(stats, field))
+            cache_entries.add_metric([cache_name], stats.size)
+            cache_bytes.add_metric([cache_name], stats.bytes)
+        yield from cache_counters.values()
+        yield cache_entries
+        yield cache_bytes
+
+        pool = get_pool_status()
+        for field in ("checked_out", "checked_in", "overflow"):
+            if field in pool:
+                yield GaugeMetricFamily(
+                    f"db_pool_{field}", f"Pool connections {field}", pool[field]
+                )
+        yield CounterMetricFamily("db_pool_waits", "Pool connection checkouts", pool["waits"])
+        yield CounterMetricFamily("db_pool_timeouts", "Pool checkout timeouts", pool["timeouts"])
+        yield CounterMetricFamily(
+            "db_pool_wait_seconds",
+            "Time spent waiting for pool connections",
+            pool["wait_seconds_total"],
+        )
+
+        buffer = quantity_buffer.stats()
+        yield GaugeMetricFamily(
+            "write_buffer_pending_products",
+            "Products with quantity adjustments waiting to be flushed",
+            buffer.pending_products,
+        )
+        yield GaugeMetricFamily(
+            "write_buffer_pending_adjustments",
+            "Quantity adjustments waiting to be flushed",
+            buffer.pending_adjustments,
+        )
+        yield CounterMetricFamily("write_buffer_flushes", "Write buffer flushes", buffer.flushes)
+        yield CounterMetricFamily(
+            "write_buffer_flushed_adjustments",
+            "Quantity adjustments written by the write buffer",
+            buffer.flushed_adjustments,
+        )
+        yield CounterMetricFamily(
+            "write_buffer_flush_failures", "Write buffer flushes that failed", buffer.failures
+        )
+        yield CounterMetricFamily(
+            "write_buffer_dropped_adjustments",
+            "Queued quantity adjustments dropped after repeated flush failures",
+            buffer.dropped_adjustments,
+        )
+
+
+registry.register(_RuntimeStatsCollector())
@@ -1,4 +1,6 @@
 from app.models.catalog import Catalog
 from app.models.product import Product
+from app.models.catalog_stats import CatalogStats, CatalogStatsDelta
+from app.models import search  # noqa: F401  registers the full-text search DDL
 
-__all__ = ["Catalog", "Product"]
+__all__ = ["Catalog", "Product", "CatalogStats", "CatalogStatsDelta"]
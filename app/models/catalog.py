@@ -1,25 +1,33 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import String, Text
+from sqlalchemy import Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.types import Timestamp
 
 
 class Catalog(Base):
     __tablename__ = "catalogs"
+    # serve the newest-first list order (and its reverse) without a sort, and the list version
+    __table_args__ = (
+        Index("ix_catalogs_created_at_id", "created_at", "id"),
+        Index("ix_catalogs_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        Timestamp, server_default=func.now(), nullable=False
+    )
     updated_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now(), nullable=False
+        Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     products: Mapped[list["Product"]] = relationship(  # noqa: F821
-        "Product", back_populates="catalog", cascade="all, delete-orphan"
+        "Product", back_populates="catalog", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import datetime
+from sqlalchemy import BigInteger, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.types import Timestamp
+
+
+class CatalogStats(Base):
+    """Inventory totals of a catalog, kept current by the product writes that change them.
+
+    Every catalog has a row, created with it and removed with it by the FK cascade. The
+    ``(statistic, catalog_id)`` indexes serve catalog lists sorted by a statistic.
+    """
+
+    __tablename__ = "catalog_stats"
+    __table_args__ = (
+        Index("ix_catalog_stats_product_count", "product_count", "catalog_id"),
+        Index("ix_catalog_stats_total_units", "total_units", "catalog_id"),
+        Index("ix_catalog_stats_inventory_value", "inventory_value", "catalog_id"),
+    )
+
+    catalog_id: Mapped[int] = mapped_column(
+        ForeignKey("catalogs.id", ondelete="CASCADE"), primary_key=True
+    )
+    product_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    total_units: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+    inventory_value: Mapped[float] = mapped_column(
+        Float, default=0, server_default="0", nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<CatalogStats(catalog_id={self.catalog_id}, product_count={self.product_count})>"
+
+
+class CatalogStatsDelta(Base):
+    """A change to a catalog's totals not folded into its ``catalog_stats`` row yet.
+
+    Quantity adjustments append one instead of updating the stats row, so concurrent
+    adjustments in a catalog do not queue on that row's lock. A periodic roll-up folds the
+    deltas into ``catalog_stats`` and deletes them.
+    """
+
+    __tablename__ = "catalog_stats_deltas"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"), primary_key=True
+    )
+    catalog_id: Mapped[int] = mapped_column(
+        ForeignKey("catalogs.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    product_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    total_units: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+    inventory_value: Mapped[float] = mapped_column(
+        Float, default=0, server_default="0", nullable=False
+    )
@@ -1,26 +1,63 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import String, Float, Text, ForeignKey
+from sqlalchemy import Index, String, Float, Text, ForeignKey, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.types import Timestamp
 
 
 class Product(Base):
     __tablename__ = "products"
+    # One (sort column, id) index per supported sort, globally and within a catalog, so list
+    # pages are read off an index in order. The updated_at indexes serve the list versions,
+    # the partial indexes serve in_stock=true lists and the pattern index serves name_prefix
+    # under non-C collations on PostgreSQL.
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_quantity_id", "quantity", "id"),
+        Index("ix_products_catalog_id_created_at_id", "catalog_id", "created_at", "id"),
+        Index("ix_products_catalog_id_price_id", "catalog_id", "price", "id"),
+        Index("ix_products_catalog_id_name_id", "catalog_id", "name", "id"),
+        Index("ix_products_catalog_id_quantity_id", "catalog_id", "quantity", "id"),
+        Index("ix_products_updated_at", "updated_at"),
+        Index("ix_products_catalog_id_updated_at", "catalog_id", "updated_at"),
+        Index(
+            "ix_products_in_stock_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("quantity > 0"),
+            sqlite_where=text("quantity > 0"),
+        ),
+        Index(
+            "ix_products_in_stock_catalog_id_created_at_id",
+            "catalog_id",
+            "created_at",
+            "id",
+            postgresql_where=text("quantity > 0"),
+            sqlite_where=text("quantity > 0"),
+        ),
+        Index(
+            "ix_products_name_pattern", "name", postgresql_ops={"name": "varchar_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     quantity: Mapped[int] = mapped_column(default=0, nullable=False)
     catalog_id: Mapped[int | None] = mapped_column(
-        ForeignKey("catalogs.id", ondelete="CASCADE"), nullable=True, index=True
+        ForeignKey("catalogs.id", ondelete="CASCADE"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        Timestamp, server_default=func.now(), nullable=False
     )
-    created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now(), nullable=False
+        Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     catalog: Mapped["Catalog | None"] = relationship("Catalog", back_populates="products")  # noqa: F821
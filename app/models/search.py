@@ -0,0 +1,66 @@
+"""Full-text search structures for products, kept outside the ORM mapping.
+
+PostgreSQL gets a ``tsvector`` column filled by a trigger, with a GIN index; SQLite gets an
+FTS5 table kept in sync by triggers. Both are created alongside the ``products`` table by
+``metadata.create_all`` and by the ``add_product_search`` migration.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.models.product import Product
+
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_products_search_vector"
+FTS_TABLE = "products_fts"
+
+# objects Alembic autogenerate must not try to drop because the models do not declare them
+SEARCH_OBJECT_NAMES = {SEARCH_VECTOR_COLUMN, SEARCH_VECTOR_INDEX, FTS_TABLE}
+
+SEARCH_VECTOR_FUNCTION = "products_search_vector_update"
+SEARCH_VECTOR_TRIGGER = "products_search_vector"
+
+# a trigger fills the column: adding a generated column would rewrite the whole table
+POSTGRES_DDL = [
+    f"ALTER TABLE products ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector",
+    f"CREATE FUNCTION {SEARCH_VECTOR_FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    f"NEW.{SEARCH_VECTOR_COLUMN} := "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B'); "
+    "RETURN NEW; END $$",
+    f"CREATE TRIGGER {SEARCH_VECTOR_TRIGGER} BEFORE INSERT OR UPDATE OF name, description "
+    f"ON products FOR EACH ROW EXECUTE FUNCTION {SEARCH_VECTOR_FUNCTION}()",
+    f"CREATE INDEX {SEARCH_VECTOR_INDEX} ON products USING gin ({SEARCH_VECTOR_COLUMN})",
+]
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "name, description, content='products', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, description ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# the triggers go with the products table; the FTS5 table and the trigger function do not
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Product.__table__,
+    "after_drop",
+    DDL(f"DROP FUNCTION IF EXISTS {SEARCH_VECTOR_FUNCTION}()").execute_if(dialect="postgresql"),
+)
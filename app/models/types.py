@@ -0,0 +1,6 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import sqlite
+
+# SQLite stores server-side CURRENT_TIMESTAMP values without microseconds, so bound
+# datetimes must be rendered the same way for comparisons (e.g. keyset pagination).
+Timestamp = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
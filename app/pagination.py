@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+from app.exceptions import BadRequestError
+
+DEFAULT_SORT = "-created_at"
+
+
+def encode_cursor(sort_value: Any, item_id: int, sort: str = DEFAULT_SORT) -> str:
+    """Encode the position after an item in a list ordered by ``sort`` and then by id."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort, sort_value, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = DEFAULT_SORT) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, sort_value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort.lstrip("-").endswith("_at"):
+            sort_value = datetime.fromisoformat(sort_value)
+        item_id = int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise BadRequestError("Invalid cursor") from None
+    if cursor_sort != sort:
+        raise BadRequestError("Cursor was issued for a different sort order")
+    return sort_value, item_id
@@ -1,4 +1,5 @@
 from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
 from app.repositories.product_repository import ProductRepository
 
-__all__ = ["CatalogRepository", "ProductRepository"]
+__all__ = ["CatalogRepository", "CatalogStatsRepository", "ProductRepository"]
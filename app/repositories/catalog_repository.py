@@ -1,42 +1,158 @@
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import Select, delete, insert, select, text, update, func, tuple_
+from sqlalchemy.engine import Row
+from typing import Any, Collection, List, Optional, Sequence
 import logging
 
+from app.cache import count_cache
+from app.config import settings
+from app.database import estimate_row_count
+from app.fieldsets import Fields, response_model, selected_columns
+from app.metrics import instrument_repository
 from app.models.catalog import Catalog
-from app.schemas.catalog import CatalogCreate, CatalogUpdate, CatalogResponse
+from app.models.catalog_stats import CatalogStats
+from app.models.product import Product
+from app.pagination import DEFAULT_SORT
+from app.schemas.catalog import (
+    CATALOG_STATS_SORTS,
+    CatalogCreate,
+    CatalogUpdate,
+    CatalogResponse,
+    CatalogExpandedResponse,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@instrument_repository
 class CatalogRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, catalog_data: CatalogCreate) -> CatalogResponse:
-        logger.info(f"Creating catalog with name: {catalog_data.name}")
-        catalog = Catalog(name=catalog_data.name, description=catalog_data.description)
-        self.session.add(catalog)
-        await self.session.flush()
-        await self.session.refresh(catalog)
-        logger.info(f"Catalog created with id: {catalog.id}")
-        return CatalogResponse.model_validate(catalog)
-
-    async def get_by_id(self, catalog_id: int) -> Optional[CatalogResponse]:
-        logger.debug(f"Fetching catalog with id: {catalog_id}")
-        result = await self.session.execute(select(Catalog).where(Catalog.id == catalog_id))
-        catalog = result.scalar_one_or_none()
-        if not catalog:
-            return None
-        return CatalogResponse.model_validate(catalog)
+        logger.info("Creating catalog with name: %s", catalog_data.name)
+        result = await self.session.execute(
+            insert(Catalog)
+            .values(name=catalog_data.name, description=catalog_data.description)
+            .returning(*Catalog.__table__.columns)
+        )
+        row = result.one()
+        logger.info("Catalog created with id: %s", row.id)
+        return CatalogResponse.model_validate(row)
 
-    async def get_by_name(self, name: str) -> Optional[CatalogResponse]:
-        logger.debug(f"Fetching catalog with name: {name}")
-        result = await self.session.execute(select(Catalog).where(Catalog.name == name))
-        catalog = result.scalar_one_or_none()
-        if not catalog:
+    async def get_by_id(
+        self, catalog_id: int, fields: Optional[Fields] = None
+    ) -> Optional[CatalogResponse]:
+        logger.debug("Fetching catalog with id: %s", catalog_id)
+        result = await self.session.execute(
+            select(*selected_columns(Catalog.__table__, fields)).where(Catalog.id == catalog_id)
+        )
+        row = result.one_or_none()
+        if row is None:
             return None
-        return CatalogResponse.model_validate(catalog)
+        return response_model(CatalogResponse, fields).model_validate(row)
+
+    async def get_by_ids(
+        self, catalog_ids: Collection[int], fields: Optional[Fields] = None
+    ) -> List[CatalogResponse]:
+        """Fetch the existing catalogs among ``catalog_ids`` in one query, in no particular order."""
+        logger.debug("Fetching %s catalogs by id", len(catalog_ids))
+        if not catalog_ids:
+            return []
+        result = await self.session.execute(
+            select(*selected_columns(Catalog.__table__, fields)).where(Catalog.id.in_(catalog_ids))
+        )
+        model = response_model(CatalogResponse, fields)
+        return [model.model_validate(row) for row in result.all()]
+
+    async def get_existing_ids(self, catalog_ids: Collection[int]) -> set[int]:
+        logger.debug("Checking existence of %s catalogs", len(catalog_ids))
+        if not catalog_ids:
+            return set()
+        result = await self.session.execute(select(Catalog.id).where(Catalog.id.in_(catalog_ids)))
+        return set(result.scalars().all())
+
+    async def count(self) -> int:
+        result = await self.session.execute(select(func.count(Catalog.id)))
+        return result.scalar() or 0
+
+    async def get_version(self) -> tuple[Optional[datetime], int]:
+        logger.debug("Fetching catalog list version")
+        # separate subqueries, so max(updated_at) is read off the end of its index
+        result = await self.session.execute(
+            select(
+                select(func.max(Catalog.updated_at)).scalar_subquery(),
+                select(func.count(Catalog.id)).scalar_subquery(),
+            )
+        )
+        last_modified, count = result.one()
+        return last_modified, count
+
+    async def estimate_count(self) -> int:
+        logger.debug("Estimating catalog count")
+        estimate = await estimate_row_count(self.session, Catalog.__tablename__)
+        if estimate is not None:
+            return estimate
+
+        cache_key = ("catalogs", None)
+        total = count_cache.get(cache_key)
+        if total is None:
+            total = await self.count()
+            count_cache.set(cache_key, total)
+        return total
+
+    def _list_query(
+        self,
+        sort: str = DEFAULT_SORT,
+        fields: Optional[Fields] = None,
+        after: Optional[tuple[Any, int]] = None,
+    ) -> Select[Any]:
+        """Catalog rows in ``sort`` order, tie-broken by id in the same direction.
+
+        Statistic sorts walk the (statistic, catalog_id) index of ``catalog_stats`` and join
+        each row to its catalog; the stats columns are selected as ``stats_<column>``.
+        """
+        columns = selected_columns(Catalog.__table__, fields)
+        field = sort.lstrip("-")
+        if field in CATALOG_STATS_SORTS:
+            sort_column, id_column = getattr(CatalogStats, field), CatalogStats.catalog_id
+            stats_columns = [
+                column.label(f"stats_{column.key}") for column in CatalogStats.__table__.columns
+            ]
+            query = select(*columns, *stats_columns).join(
+                CatalogStats, CatalogStats.catalog_id == Catalog.id
+            )
+        else:
+            sort_column, id_column = Catalog.created_at, Catalog.id
+            query = select(*columns)
+
+        if sort.startswith("-"):
+            if after is not None:
+                query = query.where(tuple_(sort_column, id_column) < after)
+            return query.order_by(sort_column.desc(), id_column.desc())
+        if after is not None:
+            query = query.where(tuple_(sort_column, id_column) > after)
+        return query.order_by(sort_column.asc(), id_column.asc())
+
+    def _validate_rows(
+        self, rows: Sequence[Row[Any]], fields: Optional[Fields], sort: str
+    ) -> List[CatalogResponse]:
+        if sort.lstrip("-") not in CATALOG_STATS_SORTS:
+            model = response_model(CatalogResponse, fields)
+            return [model.model_validate(row) for row in rows]
+
+        expanded = response_model(CatalogExpandedResponse, fields and fields + ("stats",))
+        stats_keys = [column.key for column in CatalogStats.__table__.columns]
+        return [
+            expanded.model_validate(
+                {
+                    **row._mapping,
+                    "stats": {key: row._mapping[f"stats_{key}"] for key in stats_keys},
+                }
+            )
+            for row in rows
+        ]
 
     async def get_all(
         self,
@@ -44,46 +160,101 @@ class CatalogRepository:
         page_size: int = 10,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
-    ) -> tuple[List[CatalogResponse], int]:
-        logger.debug(f"Fetching catalogs - page: {page}, page_size: {page_size}")
+        include_total: bool = True,
+        fields: Optional[Fields] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> tuple[List[CatalogResponse], Optional[int]]:
+        logger.debug("Fetching catalogs - page: %s, page_size: %s", page, page_size)
 
-        count_result = await self.session.execute(select(func.count(Catalog.id)))
-        total = count_result.scalar() or 0
+        total = await self.count() if include_total else None
 
         offset = skip if skip is not None else (page - 1) * page_size
         limit_val = limit if limit is not None else page_size
 
         result = await self.session.execute(
-            select(Catalog).offset(offset).limit(limit_val).order_by(Catalog.created_at.desc())
+            self._list_query(sort, fields).offset(offset).limit(limit_val)
+        )
+        catalogs = result.all()
+
+        logger.debug("Fetched %s catalogs out of %s total", len(catalogs), total)
+        return self._validate_rows(catalogs, fields, sort), total
+
+    async def get_page_after(
+        self,
+        page_size: int = 10,
+        after: Optional[tuple[Any, int]] = None,
+        fields: Optional[Fields] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> tuple[List[CatalogResponse], bool]:
+        logger.debug("Fetching catalogs after %s - page_size: %s", after, page_size)
+
+        result = await self.session.execute(
+            self._list_query(sort, fields, after).limit(page_size + 1)
+        )
+        catalogs = result.all()
+        has_more = len(catalogs) > page_size
+
+        logger.debug("Fetched %s catalogs, has_more: %s", min(len(catalogs), page_size), has_more)
+        return self._validate_rows(catalogs[:page_size], fields, sort), has_more
+
+    async def update(
+        self, catalog_id: int, catalog_data: CatalogUpdate
+    ) -> Optional[CatalogResponse]:
+        logger.info("Updating catalog with id: %s", catalog_id)
+        values = catalog_data.model_dump(exclude_none=True)
+        if not values:
+            return await self.get_by_id(catalog_id)
+
+        result = await self.session.execute(
+            update(Catalog)
+            .where(Catalog.id == catalog_id)
+            .values(**values)
+            .returning(*Catalog.__table__.columns)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        logger.info("Catalog updated: %s", row.id)
+        return CatalogResponse.model_validate(row)
+
+    async def _cascades_deletes(self) -> bool:
+        if self.session.get_bind().dialect.name != "sqlite":
+            return True
+        result = await self.session.execute(text("PRAGMA foreign_keys"))
+        return bool(result.scalar())
+
+    async def _delete_products_in_chunks(self, catalog_id: int) -> None:
+        chunk_size = settings.CATALOG_DELETE_CHUNK_SIZE
+        while True:
+            chunk = (
+                select(Product.id)
+                .where(Product.catalog_id == catalog_id)
+                .limit(chunk_size)
+                .scalar_subquery()
+            )
+            result = await self.session.execute(
+                delete(Product)
+                .where(Product.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            logger.debug("Deleted %s products of catalog %s", result.rowcount, catalog_id)
+            if result.rowcount < chunk_size:
+                return
+
+    async def delete(self, catalog_id: int) -> bool:
+        logger.info("Deleting catalog with id: %s", catalog_id)
+        # products go with the catalog through the FK's ON DELETE CASCADE; without it
+        # they are removed in fixed-size set-based chunks, never loaded into the session
+        if not await self._cascades_deletes():
+            await self._delete_products_in_chunks(catalog_id)
+            await self.session.execute(
+                delete(CatalogStats).where(CatalogStats.catalog_id == catalog_id)
+            )
+
+        result = await self.session.execute(
+            delete(Catalog).where(Catalog.id == catalog_id).returning(Catalog.id)
         )
-        catalogs = result.scalars().all()
-
-        logger.debug(f"Fetched {len(catalogs)} catalogs out of {total} total")
-        return [CatalogResponse.model_validate(c) for c in catalogs], total
-
-    async def update(self, catalog_id: int, catalog_data: CatalogUpdate) -> CatalogResponse:
-        logger.info(f"Updating catalog with id: {catalog_id}")
-        result = await self.session.execute(select(Catalog).where(Catalog.id == catalog_id))
-        catalog = result.scalar_one_or_none()
-        if not catalog:
-            raise ValueError(f"Catalog with id {catalog_id} not found")
-
-        if catalog_data.name is not None:
-            catalog.name = catalog_data.name
-        if catalog_data.description is not None:
-            catalog.description = catalog_data.description
-
-        await self.session.flush()
-        await self.session.refresh(catalog)
-        logger.info(f"Catalog updated: {catalog.id}")
-        return CatalogResponse.model_validate(catalog)
-
-    async def delete(self, catalog_id: int) -> None:
-        logger.info(f"Deleting catalog with id: {catalog_id}")
-        result = await self.session.execute(select(Catalog).where(Catalog.id == catalog_id))
-        catalog = result.scalar_one_or_none()
-        if not catalog:
-            raise ValueError(f"Catalog with id {catalog_id} not found")
-        await self.session.delete(catalog)
-        await self.session.flush()
-        logger.info(f"Catalog deleted: {catalog_id}")
+        if result.scalar_one_or_none() is None:
+            return False
+        logger.info("Catalog deleted: %s", catalog_id)
+        return True
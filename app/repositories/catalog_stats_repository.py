@@ -0,0 +1,196 @@
+from collections.abc import Collection, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Insert, delete, func, insert, select, text, true
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Any, Optional
+import logging
+
+from app.metrics import instrument_repository
+from app.models.catalog import Catalog
+from app.models.catalog_stats import CatalogStats, CatalogStatsDelta
+from app.models.product import Product
+from app.schemas.catalog import CatalogStatsResponse
+from app.schemas.product import ProductCreate, ProductResponse
+
+logger = logging.getLogger(__name__)
+
+# anything carrying the catalog_id, price and quantity a product contributes to its catalog
+StatsContribution = ProductCreate | ProductResponse
+
+STATS_COLUMNS = ["catalog_id", "product_count", "total_units", "inventory_value"]
+
+
+def _deltas(
+    added: Iterable[StatsContribution], removed: Iterable[StatsContribution]
+) -> list[dict[str, Any]]:
+    deltas: dict[int, tuple[int, int, float]] = {}
+    for sign, products in ((1, added), (-1, removed)):
+        for product in products:
+            if product.catalog_id is None:
+                continue
+            count, units, value = deltas.get(product.catalog_id, (0, 0, 0.0))
+            deltas[product.catalog_id] = (
+                count + sign,
+                units + sign * product.quantity,
+                value + sign * product.price * product.quantity,
+            )
+    return [
+        dict(zip(STATS_COLUMNS, (catalog_id, *delta), strict=True))
+        for catalog_id, delta in sorted(deltas.items())
+        if any(delta)
+    ]
+
+
+@instrument_repository
+class CatalogStatsRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _upsert(self) -> Insert:
+        dialect = self.session.get_bind().dialect.name
+        return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(CatalogStats)
+
+    async def create(self, catalog_id: int) -> None:
+        logger.debug("Creating stats for catalog %s", catalog_id)
+        await self.session.execute(insert(CatalogStats).values(catalog_id=catalog_id))
+
+    async def get(self, catalog_id: int) -> Optional[CatalogStatsResponse]:
+        logger.debug("Fetching stats of catalog %s", catalog_id)
+        result = await self.session.execute(
+            select(*CatalogStats.__table__.columns).where(CatalogStats.catalog_id == catalog_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return CatalogStatsResponse.model_validate(row)
+
+    async def get_by_catalog_ids(
+        self, catalog_ids: Collection[int]
+    ) -> dict[int, CatalogStatsResponse]:
+        logger.debug("Fetching stats of %s catalogs", len(catalog_ids))
+        if not catalog_ids:
+            return {}
+        result = await self.session.execute(
+            select(*CatalogStats.__table__.columns).where(CatalogStats.catalog_id.in_(catalog_ids))
+        )
+        return {row.catalog_id: CatalogStatsResponse.model_validate(row) for row in result.all()}
+
+    async def apply(
+        self,
+        added: Iterable[StatsContribution] = (),
+        removed: Iterable[StatsContribution] = (),
+    ) -> None:
+        """Add the contribution of ``added`` products to their catalogs and take off ``removed``.
+
+        The change is applied as deltas in one upsert, so concurrent writers never overwrite
+        each other's totals. Rows are written in catalog id order to lock them consistently.
+        """
+        await self._add(_deltas(added, removed))
+
+    async def record(
+        self,
+        added: Iterable[StatsContribution] = (),
+        removed: Iterable[StatsContribution] = (),
+    ) -> None:
+        """Like ``apply``, but only append the deltas to ``catalog_stats_deltas``.
+
+        Nothing is locked: the totals change once ``roll_up`` folds the deltas in.
+        """
+        rows = _deltas(added, removed)
+        if rows:
+            await self.session.execute(insert(CatalogStatsDelta), rows)
+
+    async def roll_up(self, limit: int) -> int:
+        """Fold up to ``limit`` recorded deltas into the stats; returns how many were folded.
+
+        The deltas are claimed by deleting them, so concurrent roll-ups never apply one twice.
+        """
+        claimed = (
+            select(CatalogStatsDelta.id)
+            .order_by(CatalogStatsDelta.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(CatalogStatsDelta)
+            .where(CatalogStatsDelta.id.in_(claimed.scalar_subquery()))
+            .returning(*(CatalogStatsDelta.__table__.c[column] for column in STATS_COLUMNS))
+        )
+        claimed_rows = result.all()
+        totals: dict[int, tuple[int, int, float]] = {}
+        for catalog_id, count, units, value in claimed_rows:
+            total_count, total_units, total_value = totals.get(catalog_id, (0, 0, 0.0))
+            totals[catalog_id] = (total_count + count, total_units + units, total_value + value)
+        logger.debug("Rolling up %s stats deltas of %s catalogs", len(claimed_rows), len(totals))
+        await self._add(
+            [
+                dict(zip(STATS_COLUMNS, (catalog_id, *total), strict=True))
+                for catalog_id, total in sorted(totals.items())
+                if any(total)
+            ]
+        )
+        return len(claimed_rows)
+
+    async def _add(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+
+        logger.debug("Applying stats deltas to %s catalogs", len(rows))
+        upsert = self._upsert().values(rows)
+        await self.session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[CatalogStats.catalog_id],
+                set_={
+                    "product_count": CatalogStats.product_count + upsert.excluded.product_count,
+                    "total_units": CatalogStats.total_units + upsert.excluded.total_units,
+                    "inventory_value": CatalogStats.inventory_value
+                    + upsert.excluded.inventory_value,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def rebuild(self, catalog_id: Optional[int] = None) -> int:
+        """Recompute the stats of one or all catalogs from ``products``; returns catalogs rebuilt.
+
+        On PostgreSQL product writes are blocked until the transaction ends so that no delta
+        lands between reading the totals and storing them.
+        """
+        logger.info(
+            "Rebuilding stats of %s", f"catalog {catalog_id}" if catalog_id else "all catalogs"
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            await self.session.execute(text("LOCK TABLE products IN SHARE MODE"))
+        # recorded deltas are already part of the products the totals are computed from
+        pending = delete(CatalogStatsDelta)
+        if catalog_id is not None:
+            pending = pending.where(CatalogStatsDelta.catalog_id == catalog_id)
+        await self.session.execute(pending)
+
+        totals = (
+            select(
+                Catalog.id,
+                func.count(Product.id),
+                func.coalesce(func.sum(Product.quantity), 0),
+                func.coalesce(func.sum(Product.price * Product.quantity), 0.0),
+            )
+            .select_from(Catalog)
+            .outerjoin(Product, Product.catalog_id == Catalog.id)
+            # SQLite needs a WHERE clause to parse ON CONFLICT after a joined SELECT
+            .where(true() if catalog_id is None else Catalog.id == catalog_id)
+            .group_by(Catalog.id)
+        )
+        upsert = self._upsert().from_select(STATS_COLUMNS, totals)
+        result = await self.session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[CatalogStats.catalog_id],
+                set_={
+                    "product_count": upsert.excluded.product_count,
+                    "total_units": upsert.excluded.total_units,
+                    "inventory_value": upsert.excluded.inventory_value,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        logger.info("Rebuilt stats of %s catalogs", result.rowcount)
+        return result.rowcount
@@ -1,123 +1,567 @@
+from collections.abc import AsyncIterator, Collection, Mapping, Sequence
+from datetime import datetime
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import (
+    Select,
+    Update,
+    case,
+    column,
+    delete,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    update,
+    func,
+    tuple_,
+    union_all,
+)
+from typing import Any, List, Optional
 import logging
+import re
 
+from app.cache import count_cache
+from app.database import estimate_row_count
+from app.fieldsets import Fields, response_model, selected_columns
+from app.metrics import instrument_repository
+from app.models.catalog_stats import CatalogStats
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.models.search import FTS_TABLE, SEARCH_CONFIG, SEARCH_VECTOR_COLUMN
+from app.pagination import DEFAULT_SORT
+from app.schemas.product import ProductCreate, ProductFilters, ProductUpdate, ProductResponse
 
 logger = logging.getLogger(__name__)
 
+_products_fts = table(FTS_TABLE, column("rowid"))
 
+SORT_COLUMNS = {
+    "created_at": Product.created_at,
+    "price": Product.price,
+    "name": Product.name,
+    "quantity": Product.quantity,
+}
+
+
+# the columns an update reads back from before the change, for the catalog stats
+PREVIOUS_COLUMNS = ("price", "quantity", "catalog_id")
+
+
+def _update_values(product_data: ProductUpdate) -> dict[str, Any]:
+    update_data = product_data.model_dump(exclude_unset=True)
+    return {
+        key: value
+        for key, value in update_data.items()
+        if value is not None or key in ("description", "catalog_id")
+    }
+
+
+def _update_returning_previous(product_id: int, values: dict[str, Any]) -> Update:
+    # the FROM subquery locks the row and reads it as it is before the SET applies
+    previous = (
+        select(Product.id, *(Product.__table__.c[name] for name in PREVIOUS_COLUMNS))
+        .where(Product.id == product_id)
+        .with_for_update()
+        .subquery("previous")
+    )
+    return (
+        update(Product)
+        .where(Product.id == previous.c.id)
+        .values(**values)
+        .returning(
+            *Product.__table__.columns,
+            *(previous.c[name].label(f"previous_{name}") for name in PREVIOUS_COLUMNS),
+        )
+    )
+
+
+def _fts5_match(query: str) -> str:
+    # quote every word so user input can never be read as FTS5 query syntax
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", query))
+
+
+@instrument_repository
 class ProductRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, product_data: ProductCreate) -> ProductResponse:
         logger.info(
-            f"Creating product with name: {product_data.name}, catalog_id: {product_data.catalog_id}"
-        )
-        product = Product(
-            name=product_data.name,
-            description=product_data.description,
-            price=product_data.price,
-            quantity=product_data.quantity,
-            catalog_id=product_data.catalog_id,
-        )
-        self.session.add(product)
-        await self.session.flush()
-        await self.session.refresh(product)
-        logger.info(f"Product created with id: {product.id}")
-        return ProductResponse.model_validate(product)
-
-    async def get_by_id(self, product_id: int) -> Optional[ProductResponse]:
-        logger.debug(f"Fetching product with id: {product_id}")
-        result = await self.session.execute(select(Product).where(Product.id == product_id))
-        product = result.scalar_one_or_none()
-        if not product:
+            "Creating product with name: %s, catalog_id: %s",
+            product_data.name,
+            product_data.catalog_id,
+        )
+        result = await self.session.execute(
+            insert(Product)
+            .values(
+                name=product_data.name,
+                description=product_data.description,
+                price=product_data.price,
+                quantity=product_data.quantity,
+                catalog_id=product_data.catalog_id,
+            )
+            .returning(*Product.__table__.columns)
+        )
+        row = result.one()
+        logger.info("Product created with id: %s", row.id)
+        return ProductResponse.model_validate(row)
+
+    async def bulk_create(self, products: List[ProductCreate], batch_size: int = 5000) -> int:
+        logger.info("Bulk inserting %s products in batches of %s", len(products), batch_size)
+        use_copy = self.session.get_bind().dialect.name == "postgresql"
+        columns = ["name", "description", "price", "quantity", "catalog_id"]
+
+        for start in range(0, len(products), batch_size):
+            batch = products[start : start + batch_size]
+            if use_copy:
+                connection = await self.session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    Product.__tablename__,
+                    records=[tuple(getattr(p, c) for c in columns) for p in batch],
+                    columns=columns,
+                )
+            else:
+                await self.session.execute(
+                    insert(Product.__table__), [p.model_dump(include=set(columns)) for p in batch]
+                )
+
+        logger.info("Bulk inserted %s products", len(products))
+        return len(products)
+
+    async def get_by_id(
+        self, product_id: int, fields: Optional[Fields] = None, for_update: bool = False
+    ) -> Optional[ProductResponse]:
+        logger.debug("Fetching product with id: %s", product_id)
+        query = select(*selected_columns(Product.__table__, fields)).where(Product.id == product_id)
+        if for_update:
+            query = query.with_for_update()
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if row is None:
             return None
-        return ProductResponse.model_validate(product)
+        return response_model(ProductResponse, fields).model_validate(row)
+
+    async def get_by_ids(
+        self, product_ids: Collection[int], fields: Optional[Fields] = None
+    ) -> List[ProductResponse]:
+        """Fetch the existing products among ``product_ids`` in one query, in no particular order."""
+        logger.debug("Fetching %s products by id", len(product_ids))
+        if not product_ids:
+            return []
+        result = await self.session.execute(
+            select(*selected_columns(Product.__table__, fields)).where(Product.id.in_(product_ids))
+        )
+        model = response_model(ProductResponse, fields)
+        return [model.model_validate(row) for row in result.all()]
+
+    async def count_by_catalog_ids(self, catalog_ids: Collection[int]) -> dict[int, int]:
+        """Product counts of ``catalog_ids`` in one grouped query; empty catalogs are left out."""
+        logger.debug("Counting products of %s catalogs", len(catalog_ids))
+        if not catalog_ids:
+            return {}
+        result = await self.session.execute(
+            select(Product.catalog_id, func.count(Product.id))
+            .where(Product.catalog_id.in_(catalog_ids))
+            .group_by(Product.catalog_id)
+        )
+        return dict(result.tuples().all())
+
+    async def get_latest_by_catalog_ids(
+        self, catalog_ids: Collection[int], per_catalog: int
+    ) -> dict[int, List[ProductResponse]]:
+        """The newest ``per_catalog`` products of each of ``catalog_ids``, in one query.
+
+        Each catalog is its own LIMITed arm of a UNION ALL, so every arm is a short read of
+        the (catalog_id, created_at, id) index however large the catalog is.
+        """
+        logger.debug("Fetching up to %s products of %s catalogs", per_catalog, len(catalog_ids))
+        if not catalog_ids:
+            return {}
+        newest = [
+            select(
+                select(*Product.__table__.columns)
+                .where(Product.catalog_id == catalog_id)
+                .order_by(Product.created_at.desc(), Product.id.desc())
+                .limit(per_catalog)
+                .subquery()
+            )
+            for catalog_id in catalog_ids
+        ]
+        result = await self.session.execute(union_all(*newest))
+        products: dict[int, List[ProductResponse]] = {}
+        for row in result.all():
+            products.setdefault(row.catalog_id, []).append(ProductResponse.model_validate(row))
+        # arms come back in no guaranteed order; each holds at most per_catalog rows
+        for catalog_products in products.values():
+            catalog_products.sort(
+                key=lambda product: (product.created_at, product.id), reverse=True
+            )
+        return products
+
+    def _filtered(
+        self,
+        query: Select[Any],
+        catalog_id: Optional[int] = None,
+        filters: Optional[ProductFilters] = None,
+    ) -> Select[Any]:
+        if catalog_id is not None:
+            query = query.where(Product.catalog_id == catalog_id)
+        if filters is None:
+            return query
+        if filters.min_price is not None:
+            query = query.where(Product.price >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.where(Product.price <= filters.max_price)
+        if filters.in_stock is not None:
+            # a literal 0, so the planner can match the partial "in stock" indexes
+            zero = literal_column("0")
+            query = query.where(
+                Product.quantity > zero if filters.in_stock else Product.quantity == zero
+            )
+        if filters.low_stock is not None:
+            query = query.where(Product.quantity <= filters.low_stock)
+        if filters.name_prefix is not None:
+            query = query.where(Product.name.startswith(filters.name_prefix, autoescape=True))
+        return query
+
+    def _list_query(
+        self,
+        catalog_id: Optional[int] = None,
+        filters: Optional[ProductFilters] = None,
+        fields: Optional[Fields] = None,
+        after: Optional[tuple[Any, int]] = None,
+    ) -> Select[Any]:
+        """Filtered product rows in ``filters.sort`` order, tie-broken by id in the same direction.
+
+        Every sort has (sort column, id) and (catalog_id, sort column, id) indexes, so the rows
+        come off an index in order and a page stops reading at its LIMIT.
+        """
+        sort = filters.sort if filters else DEFAULT_SORT
+        sort_column = SORT_COLUMNS[sort.lstrip("-")]
+        query = self._filtered(
+            select(*selected_columns(Product.__table__, fields, (sort_column.key,))),
+            catalog_id,
+            filters,
+        )
+        if sort.startswith("-"):
+            if after is not None:
+                query = query.where(tuple_(sort_column, Product.id) < after)
+            return query.order_by(sort_column.desc(), Product.id.desc())
+        if after is not None:
+            query = query.where(tuple_(sort_column, Product.id) > after)
+        return query.order_by(sort_column.asc(), Product.id.asc())
+
+    def _validate_rows(
+        self, rows: Sequence[Any], fields: Optional[Fields], filters: Optional[ProductFilters]
+    ) -> List[ProductResponse]:
+        sort = filters.sort if filters else DEFAULT_SORT
+        model = response_model(ProductResponse, fields, (sort.lstrip("-"),))
+        return [model.model_validate(row) for row in rows]
+
+    async def count(
+        self, catalog_id: Optional[int] = None, filters: Optional[ProductFilters] = None
+    ) -> int:
+        query = self._filtered(select(func.count(Product.id)), catalog_id, filters)
+        result = await self.session.execute(query)
+        return result.scalar() or 0
+
+    async def get_version(self, catalog_id: Optional[int] = None) -> tuple[Optional[datetime], int]:
+        """max(updated_at) and count of the products of a catalog, or of all products.
+
+        The newest update is read off the end of an updated_at index. The counts come from
+        ``catalog_stats``: one row for a catalog, or all of them plus the products that have
+        no catalog. Neither has to read every product.
+        """
+        logger.debug("Fetching product list version for catalog_id: %s", catalog_id)
+        last_modified = select(func.max(Product.updated_at))
+        if catalog_id is not None:
+            last_modified = last_modified.where(Product.catalog_id == catalog_id)
+            count = select(CatalogStats.product_count).where(CatalogStats.catalog_id == catalog_id)
+            query = select(last_modified.scalar_subquery(), count.scalar_subquery())
+        else:
+            catalogued = select(func.coalesce(func.sum(CatalogStats.product_count), 0))
+            uncatalogued = select(func.count(Product.id)).where(Product.catalog_id.is_(None))
+            query = select(
+                last_modified.scalar_subquery(),
+                catalogued.scalar_subquery() + uncatalogued.scalar_subquery(),
+            )
+        result = await self.session.execute(query)
+        last_modified_at, count = result.one()
+        return last_modified_at, count or 0
+
+    async def estimate_count(
+        self, catalog_id: Optional[int] = None, filters: Optional[ProductFilters] = None
+    ) -> int:
+        logger.debug("Estimating product count for catalog_id: %s", catalog_id)
+        filter_values = filters.model_dump(exclude={"sort"}, exclude_none=True) if filters else {}
+        if catalog_id is None and not filter_values:
+            estimate = await estimate_row_count(self.session, Product.__tablename__)
+            if estimate is not None:
+                return estimate
+
+        cache_key = ("products", catalog_id, tuple(sorted(filter_values.items())))
+        total = count_cache.get(cache_key)
+        if total is None:
+            total = await self.count(catalog_id, filters)
+            count_cache.set(cache_key, total)
+        return total
 
     async def get_by_catalog_id(
         self,
         catalog_id: int,
         page: int = 1,
         page_size: int = 10,
-    ) -> tuple[List[ProductResponse], int]:
+        include_total: bool = True,
+        fields: Optional[Fields] = None,
+        filters: Optional[ProductFilters] = None,
+    ) -> tuple[List[ProductResponse], Optional[int]]:
         logger.debug(
-            f"Fetching products for catalog_id: {catalog_id} - page: {page}, page_size: {page_size}"
+            "Fetching products for catalog_id: %s - page: %s, page_size: %s",
+            catalog_id,
+            page,
+            page_size,
         )
 
-        count_result = await self.session.execute(
-            select(func.count(Product.id)).where(Product.catalog_id == catalog_id)
-        )
-        total = count_result.scalar() or 0
+        total = await self.count(catalog_id, filters) if include_total else None
 
         offset = (page - 1) * page_size
         result = await self.session.execute(
-            select(Product)
-            .where(Product.catalog_id == catalog_id)
-            .offset(offset)
-            .limit(page_size)
-            .order_by(Product.created_at.desc())
+            self._list_query(catalog_id, filters, fields).offset(offset).limit(page_size)
         )
-        products = result.scalars().all()
+        products = result.all()
 
         logger.debug(
-            f"Fetched {len(products)} products out of {total} total for catalog {catalog_id}"
+            "Fetched %s products out of %s total for catalog %s", len(products), total, catalog_id
         )
-        return [ProductResponse.model_validate(p) for p in products], total
+        return self._validate_rows(products, fields, filters), total
 
     async def get_all(
         self,
         page: int = 1,
         page_size: int = 10,
-    ) -> tuple[List[ProductResponse], int]:
-        logger.debug(f"Fetching all products - page: {page}, page_size: {page_size}")
+        include_total: bool = True,
+        fields: Optional[Fields] = None,
+        filters: Optional[ProductFilters] = None,
+    ) -> tuple[List[ProductResponse], Optional[int]]:
+        logger.debug("Fetching all products - page: %s, page_size: %s", page, page_size)
 
-        count_result = await self.session.execute(select(func.count(Product.id)))
-        total = count_result.scalar() or 0
+        total = await self.count(filters=filters) if include_total else None
 
         offset = (page - 1) * page_size
         result = await self.session.execute(
-            select(Product).offset(offset).limit(page_size).order_by(Product.created_at.desc())
-        )
-        products = result.scalars().all()
-
-        logger.debug(f"Fetched {len(products)} products out of {total} total")
-        return [ProductResponse.model_validate(p) for p in products], total
-
-    async def update(self, product_id: int, product_data: ProductUpdate) -> ProductResponse:
-        logger.info(f"Updating product with id: {product_id}")
-        result = await self.session.execute(select(Product).where(Product.id == product_id))
-        product = result.scalar_one_or_none()
-        if not product:
-            raise ValueError(f"Product with id {product_id} not found")
-
-        update_data = product_data.model_dump(exclude_unset=True)
-
-        if "name" in update_data and update_data["name"] is not None:
-            product.name = update_data["name"]
-        if "description" in update_data:
-            product.description = update_data["description"]
-        if "price" in update_data and update_data["price"] is not None:
-            product.price = update_data["price"]
-        if "quantity" in update_data and update_data["quantity"] is not None:
-            product.quantity = update_data["quantity"]
-        if "catalog_id" in update_data:
-            product.catalog_id = update_data["catalog_id"]
-
-        await self.session.flush()
-        await self.session.refresh(product)
-        logger.info(f"Product updated: {product.id}")
-        return ProductResponse.model_validate(product)
-
-    async def delete(self, product_id: int) -> None:
-        logger.info(f"Deleting product with id: {product_id}")
-        result = await self.session.execute(select(Product).where(Product.id == product_id))
-        product = result.scalar_one_or_none()
-        if not product:
-            raise ValueError(f"Product with id {product_id} not found")
-        await self.session.delete(product)
-        await self.session.flush()
-        logger.info(f"Product deleted: {product_id}")
+            self._list_query(filters=filters, fields=fields).offset(offset).limit(page_size)
+        )
+        products = result.all()
+
+        logger.debug("Fetched %s products out of %s total", len(products), total)
+        return self._validate_rows(products, fields, filters), total
+
+    async def get_page_after(
+        self,
+        page_size: int = 10,
+        after: Optional[tuple[Any, int]] = None,
+        catalog_id: Optional[int] = None,
+        fields: Optional[Fields] = None,
+        filters: Optional[ProductFilters] = None,
+    ) -> tuple[List[ProductResponse], bool]:
+        logger.debug(
+            "Fetching products after %s - catalog_id: %s, page_size: %s",
+            after,
+            catalog_id,
+            page_size,
+        )
+
+        result = await self.session.execute(
+            self._list_query(catalog_id, filters, fields, after).limit(page_size + 1)
+        )
+        products = result.all()
+        has_more = len(products) > page_size
+
+        logger.debug("Fetched %s products, has_more: %s", min(len(products), page_size), has_more)
+        return self._validate_rows(products[:page_size], fields, filters), has_more
+
+    async def search(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = 10,
+        catalog_id: Optional[int] = None,
+        include_total: bool = True,
+        fields: Optional[Fields] = None,
+    ) -> tuple[List[ProductResponse], Optional[int]]:
+        """Rank products whose name or description match every term of ``query``.
+
+        Matching goes through the full-text index (GIN on PostgreSQL, FTS5 on SQLite), so
+        only matching rows are ranked and sorted. Name matches rank above description ones.
+        """
+        logger.debug(
+            "Searching products for %r - catalog_id: %s, page: %s, page_size: %s",
+            query,
+            catalog_id,
+            page,
+            page_size,
+        )
+        columns = selected_columns(Product.__table__, fields)
+
+        if self.session.get_bind().dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            search_vector = literal_column(f"{Product.__tablename__}.{SEARCH_VECTOR_COLUMN}")
+            matches = search_vector.op("@@")(ts_query)
+            base = select(*columns).where(matches)
+            count_query = select(func.count()).select_from(Product).where(matches)
+            rank = func.ts_rank_cd(search_vector, ts_query).desc()
+        else:
+            match = _fts5_match(query)
+            if not match:
+                return [], 0 if include_total else None
+            # the FTS5 table name doubles as the column that MATCH and bm25() apply to
+            fts = literal_column(FTS_TABLE)
+            matches = fts.op("MATCH")(match)
+            joined = Product.__table__.join(_products_fts, Product.id == _products_fts.c.rowid)
+            base = select(*columns).select_from(joined).where(matches)
+            count_query = select(func.count()).select_from(joined).where(matches)
+            # bm25() is lower for better matches; weigh name hits above description hits
+            rank = func.bm25(fts, 10.0, 1.0)
+
+        if catalog_id is not None:
+            base = base.where(Product.catalog_id == catalog_id)
+            count_query = count_query.where(Product.catalog_id == catalog_id)
+
+        total = None
+        if include_total:
+            total = (await self.session.execute(count_query)).scalar() or 0
+
+        result = await self.session.execute(
+            base.order_by(rank, Product.id.desc()).offset((page - 1) * page_size).limit(page_size)
+        )
+        model = response_model(ProductResponse, fields)
+        products = [model.model_validate(row) for row in result.all()]
+
+        logger.debug("Found %s products out of %s matches", len(products), total)
+        return products, total
+
+    async def stream_rows(
+        self,
+        catalog_id: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        logger.debug(
+            "Streaming products for catalog_id: %s in chunks of %s", catalog_id, chunk_size
+        )
+
+        # oldest first, off the (created_at, id) indexes, so no sort holds up the first chunk
+        query = select(*Product.__table__.columns).order_by(Product.created_at, Product.id)
+        if catalog_id is not None:
+            query = query.where(Product.catalog_id == catalog_id)
+
+        result = await self.session.stream(query.execution_options(yield_per=chunk_size))
+        async for chunk in result.mappings().partitions(chunk_size):
+            yield chunk
+
+    async def update(
+        self, product_id: int, product_data: ProductUpdate
+    ) -> Optional[ProductResponse]:
+        logger.info("Updating product with id: %s", product_id)
+        values = _update_values(product_data)
+        if not values:
+            return await self.get_by_id(product_id)
+
+        result = await self.session.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**values)
+            .returning(*Product.__table__.columns)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        logger.info("Product updated: %s", row.id)
+        return ProductResponse.model_validate(row)
+
+    async def update_with_previous(
+        self, product_id: int, product_data: ProductUpdate
+    ) -> Optional[tuple[ProductResponse, ProductResponse]]:
+        """Update the product and return it as it was before and after, or None if missing.
+
+        On PostgreSQL a single UPDATE ... FROM locks and reads the old row and returns both.
+        SQLite's RETURNING cannot reach the FROM clause, so there the row is read first.
+        """
+        values = _update_values(product_data)
+        if values and self.session.get_bind().dialect.name == "postgresql":
+            logger.info("Updating product with id: %s", product_id)
+            result = await self.session.execute(_update_returning_previous(product_id, values))
+            row = result.one_or_none()
+            if row is None:
+                return None
+            updated = ProductResponse.model_validate(row)
+            previous = updated.model_copy(
+                update={name: getattr(row, f"previous_{name}") for name in PREVIOUS_COLUMNS}
+            )
+            return previous, updated
+
+        previous = await self.get_by_id(product_id, for_update=True)
+        if previous is None:
+            return None
+        updated = await self.update(product_id, product_data) if values else previous
+        if updated is None:
+            return None
+        return previous, updated
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, allow_negative: bool = False
+    ) -> Optional[ProductResponse]:
+        """Add ``delta`` to the quantity in a single UPDATE, without reading the row first.
+
+        Returns None when no row matched: the product does not exist or, unless
+        ``allow_negative``, the change would have taken its quantity below zero.
+        """
+        logger.info("Adjusting quantity of product %s by %s", product_id, delta)
+        query = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(quantity=Product.quantity + delta)
+        )
+        if not allow_negative:
+            query = query.where(Product.quantity + delta >= 0)
+
+        result = await self.session.execute(query.returning(*Product.__table__.columns))
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return ProductResponse.model_validate(row)
+
+    async def adjust_quantities(
+        self, deltas: Mapping[int, int], guarded: Collection[int] = ()
+    ) -> dict[int, ProductResponse]:
+        """Add a delta to the quantity of many products in a single UPDATE.
+
+        Products in ``guarded`` are only changed if their quantity stays at or above zero.
+        Returns the updated products by id; missing or guarded-out ones are absent.
+        """
+        logger.info("Adjusting quantity of %s products", len(deltas))
+        if not deltas:
+            return {}
+        delta = case(dict(deltas), value=Product.id, else_=0)
+        query = (
+            update(Product).where(Product.id.in_(deltas)).values(quantity=Product.quantity + delta)
+        )
+        if guarded:
+            query = query.where(or_(Product.id.not_in(guarded), Product.quantity + delta >= 0))
+
+        result = await self.session.execute(
+            query.returning(*Product.__table__.columns).execution_options(synchronize_session=False)
+        )
+        return {row.id: ProductResponse.model_validate(row) for row in result.all()}
+
+    async def delete(self, product_id: int) -> Optional[ProductResponse]:
+        logger.info("Deleting product with id: %s", product_id)
+        result = await self.session.execute(
+            delete(Product).where(Product.id == product_id).returning(*Product.__table__.columns)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        logger.info("Product deleted: %s", product_id)
+        return ProductResponse.model_validate(row)
@@ -0,0 +1,31 @@
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.background import BackgroundTask
+
+
+class PydanticResponse(Response):
+    """JSON response rendered straight from an already validated Pydantic model.
+
+    FastAPI re-validates a model returned from an endpoint against the route's
+    ``response_model`` before encoding it. Returning this response instead skips that
+    pass: the schemas built by the repositories are serialized to bytes once, in
+    pydantic-core. Routes still declare ``response_model`` so the OpenAPI schema is
+    unchanged.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        super().__init__(content, status_code=status_code, headers=headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
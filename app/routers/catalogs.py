@@ -1,17 +1,44 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
+from app.cache import (
+    CacheBackend,
+    get_entity_cache,
+    get_invalidating_cache,
+    get_read_cache,
+)
+from app.conditional import entity_validators, list_validators
+from app.database import get_db, get_read_db
+from app.fieldsets import parse_fields, parse_include
+from app.responses import PydanticResponse
 from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.repositories.product_repository import ProductRepository
 from app.services.catalog import (
     CreateCatalog,
     GetCatalog,
     GetCatalogList,
+    GetCatalogListVersion,
     UpdateCatalog,
     DeleteCatalog,
+    BatchGetCatalogs,
+    ExpandCatalogs,
+    GetCatalogStats,
+)
+from app.schemas.base import BatchGetRequest
+from app.schemas.catalog import (
+    CATALOG_INCLUDES,
+    CATALOG_STATS_SORTS,
+    CatalogCreate,
+    CatalogUpdate,
+    CatalogResponse,
+    CatalogExpandedResponse,
+    CatalogExpandedListResponse,
+    CatalogBatchGetResponse,
+    CatalogSort,
+    CatalogStatsResponse,
 )
-from app.schemas.catalog import CatalogCreate, CatalogUpdate, CatalogResponse, CatalogListResponse
 
 router = APIRouter()
 
@@ -22,50 +49,189 @@ def get_catalog_repository(
     return CatalogRepository(session)
 
 
-@router.post("/catalogs", status_code=201)
+def get_product_repository(
+    session: AsyncSession = Depends(get_db),
+) -> ProductRepository:
+    return ProductRepository(session)
+
+
+def get_catalog_stats_repository(
+    session: AsyncSession = Depends(get_db),
+) -> CatalogStatsRepository:
+    return CatalogStatsRepository(session)
+
+
+def get_read_catalog_repository(
+    session: AsyncSession = Depends(get_read_db),
+) -> CatalogRepository:
+    return CatalogRepository(session)
+
+
+def get_read_product_repository(
+    session: AsyncSession = Depends(get_read_db),
+) -> ProductRepository:
+    return ProductRepository(session)
+
+
+def get_read_catalog_stats_repository(
+    session: AsyncSession = Depends(get_read_db),
+) -> CatalogStatsRepository:
+    return CatalogStatsRepository(session)
+
+
+INCLUDE_DESCRIPTION = (
+    "Comma-separated related data to embed: products (newest first, up to products_limit), "
+    "product_count and/or stats. Responses with include= carry no ETag."
+)
+
+
+@router.post("/catalogs", status_code=201, response_model=CatalogResponse)
 async def create_catalog(
     catalog_data: CatalogCreate,
     repository: CatalogRepository = Depends(get_catalog_repository),
-) -> CatalogResponse:
-    service = CreateCatalog(repository)
-    return await service.execute(catalog_data)
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+) -> Response:
+    service = CreateCatalog(repository, stats_repository)
+    return PydanticResponse(await service.execute(catalog_data), status_code=201)
 
 
-@router.get("/catalogs")
+@router.get("/catalogs", response_model=CatalogExpandedListResponse)
 async def get_catalogs(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     skip: Optional[int] = Query(None, ge=0, description="Skip records"),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Limit records"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from a previous page's next_cursor (empty value starts a "
+        "cursor walk). Cursor pages skip the total count and cost the same at any depth.",
+    ),
+    include_total: Optional[bool] = Query(
+        None,
+        description="Include the total count (defaults to true for page-based requests and "
+        "false for cursor requests)",
+    ),
+    estimate_total: bool = Query(
+        False, description="Return a cheap estimated total instead of an exact count"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name. Only "
+        "these columns are read from the database.",
+    ),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    products_limit: int = Query(
+        10, ge=1, le=50, description="Products embedded per catalog with include=products"
+    ),
+    sort: CatalogSort = Query(
+        "-created_at",
+        description="Sort field, prefixed with - for descending order. Sorting by a statistic "
+        "embeds the stats of each catalog.",
+    ),
+    repository: CatalogRepository = Depends(get_read_catalog_repository),
+    product_repository: ProductRepository = Depends(get_read_product_repository),
+    stats_repository: CatalogStatsRepository = Depends(get_read_catalog_stats_repository),
+) -> Response:
+    included = parse_include(include, CATALOG_INCLUDES)
+    # the catalog list version does not follow product changes, so product-derived data
+    # (embedded or sorted by) opts out of conditional requests
+    validators = None
+    if not included and sort.lstrip("-") not in CATALOG_STATS_SORTS:
+        last_modified, count = await GetCatalogListVersion(repository).execute()
+        validators = list_validators(request, "catalogs", last_modified, count)
+        if validators.matches(request):
+            return validators.not_modified()
+
+    service = GetCatalogList(repository, ExpandCatalogs(product_repository, stats_repository))
+    result = await service.execute(
+        page=page,
+        page_size=page_size,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total,
+        fields=parse_fields(fields, CatalogResponse),
+        include=included,
+        products_limit=products_limit,
+        sort=sort,
+    )
+    return PydanticResponse(result, headers=validators and validators.headers())
+
+
+@router.post("/catalogs:batchGet", response_model=CatalogBatchGetResponse)
+async def batch_get_catalogs(
+    body: BatchGetRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name. Only "
+        "these columns are read from the database.",
+    ),
     repository: CatalogRepository = Depends(get_catalog_repository),
-) -> CatalogListResponse:
-    service = GetCatalogList(repository)
-    return await service.execute(page=page, page_size=page_size, skip=skip, limit=limit)
+    cache: Optional[CacheBackend] = Depends(get_entity_cache),
+) -> Response:
+    service = BatchGetCatalogs(repository, cache)
+    result = await service.execute(body.ids, parse_fields(fields, CatalogResponse))
+    return PydanticResponse(result)
 
 
-@router.get("/catalogs/{catalog_id}")
+@router.get("/catalogs/{catalog_id}", response_model=CatalogExpandedResponse)
 async def get_catalog(
     catalog_id: int,
-    repository: CatalogRepository = Depends(get_catalog_repository),
-) -> CatalogResponse:
-    service = GetCatalog(repository)
-    return await service.execute(catalog_id)
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name. Only "
+        "these columns are read from the database.",
+    ),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    products_limit: int = Query(
+        10, ge=1, le=50, description="Products embedded with include=products"
+    ),
+    repository: CatalogRepository = Depends(get_read_catalog_repository),
+    product_repository: ProductRepository = Depends(get_read_product_repository),
+    stats_repository: CatalogStatsRepository = Depends(get_read_catalog_stats_repository),
+    cache: Optional[CacheBackend] = Depends(get_read_cache),
+) -> Response:
+    selected_fields = parse_fields(fields, CatalogResponse)
+    included = parse_include(include, CATALOG_INCLUDES)
+    service = GetCatalog(repository, cache, ExpandCatalogs(product_repository, stats_repository))
+    catalog = await service.execute(catalog_id, selected_fields, included, products_limit)
+    if included:
+        return PydanticResponse(catalog)
+
+    validators = entity_validators("catalog", catalog.id, catalog.updated_at, selected_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    return PydanticResponse(catalog, headers=validators.headers())
+
+
+@router.get("/catalogs/{catalog_id}/stats", response_model=CatalogStatsResponse)
+async def get_catalog_stats(
+    catalog_id: int,
+    stats_repository: CatalogStatsRepository = Depends(get_read_catalog_stats_repository),
+) -> Response:
+    service = GetCatalogStats(stats_repository)
+    return PydanticResponse(await service.execute(catalog_id))
 
 
-@router.put("/catalogs/{catalog_id}")
+@router.put("/catalogs/{catalog_id}", response_model=CatalogResponse)
 async def update_catalog(
     catalog_id: int,
     catalog_data: CatalogUpdate,
     repository: CatalogRepository = Depends(get_catalog_repository),
-) -> CatalogResponse:
-    service = UpdateCatalog(repository)
-    return await service.execute(catalog_id, catalog_data)
+    cache: Optional[CacheBackend] = Depends(get_invalidating_cache),
+) -> Response:
+    service = UpdateCatalog(repository, cache)
+    return PydanticResponse(await service.execute(catalog_id, catalog_data))
 
 
 @router.delete("/catalogs/{catalog_id}", status_code=204)
 async def delete_catalog(
     catalog_id: int,
     repository: CatalogRepository = Depends(get_catalog_repository),
+    cache: Optional[CacheBackend] = Depends(get_invalidating_cache),
 ) -> None:
-    service = DeleteCatalog(repository)
+    service = DeleteCatalog(repository, cache)
     await service.execute(catalog_id)
@@ -1,18 +1,47 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
+from app.cache import (
+    CacheBackend,
+    get_entity_cache,
+    get_invalidating_cache,
+    get_read_cache,
+)
+from app.conditional import entity_validators, list_validators
+from app.database import get_db, get_read_db
+from app.fieldsets import parse_fields
+from app.responses import PydanticResponse
+from app.write_buffer import QuantityWriteBuffer, get_quantity_buffer
 from app.repositories.product_repository import ProductRepository
 from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
 from app.services.product import (
     CreateProduct,
     GetProduct,
     GetProductList,
+    GetProductListVersion,
     UpdateProduct,
     DeleteProduct,
+    BulkCreateProducts,
+    ExportProducts,
+    SearchProducts,
+    BatchGetProducts,
+    AdjustProductQuantity,
+)
+from app.services.product.export_products import ExportFormat
+from app.schemas.base import BatchGetRequest
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductQuantityAdjust,
+    ProductResponse,
+    ProductListResponse,
+    ProductBatchGetResponse,
+    ProductFilters,
+    ProductBulkResponse,
 )
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
 
 router = APIRouter()
 
@@ -29,52 +58,233 @@ def get_catalog_repository(
     return CatalogRepository(session)
 
 
-@router.post("/products", status_code=201)
+def get_catalog_stats_repository(
+    session: AsyncSession = Depends(get_db),
+) -> CatalogStatsRepository:
+    return CatalogStatsRepository(session)
+
+
+def get_read_product_repository(
+    session: AsyncSession = Depends(get_read_db),
+) -> ProductRepository:
+    return ProductRepository(session)
+
+
+def get_read_catalog_repository(
+    session: AsyncSession = Depends(get_read_db),
+) -> CatalogRepository:
+    return CatalogRepository(session)
+
+
+@router.post("/products", status_code=201, response_model=ProductResponse)
 async def create_product(
     product_data: ProductCreate,
     product_repository: ProductRepository = Depends(get_product_repository),
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+) -> Response:
+    service = CreateProduct(product_repository, stats_repository)
+    return PydanticResponse(await service.execute(product_data), status_code=201)
+
+
+@router.post(
+    "/products/bulk",
+    response_model=ProductBulkResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ProductCreate"},
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_products(
+    request: Request,
+    product_repository: ProductRepository = Depends(get_product_repository),
     catalog_repository: CatalogRepository = Depends(get_catalog_repository),
-) -> ProductResponse:
-    service = CreateProduct(product_repository, catalog_repository)
-    return await service.execute(product_data)
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+) -> Response:
+    ndjson = request.headers.get("content-type", "").startswith("application/x-ndjson")
+    service = BulkCreateProducts(product_repository, catalog_repository, stats_repository)
+    return PydanticResponse(await service.execute(request.stream(), ndjson=ndjson))
 
 
-@router.get("/products")
+@router.get("/products", response_model=ProductListResponse)
 async def get_products(
+    request: Request,
+    filters: ProductFilters = Depends(),
     catalog_id: Optional[int] = Query(None, description="Filter by catalog ID"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from a previous page's next_cursor (empty value starts a "
+        "cursor walk). Cursor pages skip the total count and cost the same at any depth.",
+    ),
+    include_total: Optional[bool] = Query(
+        None,
+        description="Include the total count (defaults to true for page-based requests and "
+        "false for cursor requests)",
+    ),
+    estimate_total: bool = Query(
+        False, description="Return a cheap estimated total instead of an exact count"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,price,quantity. Only "
+        "these columns are read from the database.",
+    ),
+    product_repository: ProductRepository = Depends(get_read_product_repository),
+    catalog_repository: CatalogRepository = Depends(get_read_catalog_repository),
+) -> Response:
+    last_modified, count = await GetProductListVersion(product_repository).execute(catalog_id)
+    validators = list_validators(request, "products", last_modified, count)
+    if validators.matches(request):
+        return validators.not_modified()
+
+    service = GetProductList(product_repository, catalog_repository)
+    result = await service.execute(
+        catalog_id=catalog_id,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total,
+        fields=parse_fields(fields, ProductResponse),
+        filters=filters,
+    )
+    return PydanticResponse(result, headers=validators.headers())
+
+
+@router.get("/products/export", response_class=StreamingResponse)
+async def export_products(
+    catalog_id: Optional[int] = Query(None, description="Filter by catalog ID"),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    # not a read-only session: server-side cursors only live inside a transaction
     product_repository: ProductRepository = Depends(get_product_repository),
     catalog_repository: CatalogRepository = Depends(get_catalog_repository),
-) -> ProductListResponse:
-    service = GetProductList(product_repository, catalog_repository)
-    return await service.execute(catalog_id=catalog_id, page=page, page_size=page_size)
+) -> StreamingResponse:
+    service = ExportProducts(product_repository, catalog_repository)
+    # the body streams from the request's session after this returns; FastAPI 0.118+ keeps
+    # yield dependencies open until the response is sent
+    chunks = await service.execute(catalog_id=catalog_id, export_format=export_format)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{export_format}"'},
+    )
+
+
+@router.get("/products/search", response_model=ProductListResponse)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    catalog_id: Optional[int] = Query(None, description="Filter by catalog ID"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Page size"),
+    include_total: bool = Query(True, description="Include the number of matching products"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,price,quantity. Only "
+        "these columns are read from the database.",
+    ),
+    product_repository: ProductRepository = Depends(get_read_product_repository),
+    catalog_repository: CatalogRepository = Depends(get_read_catalog_repository),
+) -> Response:
+    service = SearchProducts(product_repository, catalog_repository)
+    result = await service.execute(
+        q,
+        catalog_id=catalog_id,
+        page=page,
+        page_size=page_size,
+        include_total=include_total,
+        fields=parse_fields(fields, ProductResponse),
+    )
+    return PydanticResponse(result)
 
 
-@router.get("/products/{product_id}")
+@router.post("/products:batchGet", response_model=ProductBatchGetResponse)
+async def batch_get_products(
+    body: BatchGetRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,price,quantity. Only "
+        "these columns are read from the database.",
+    ),
+    product_repository: ProductRepository = Depends(get_product_repository),
+    cache: Optional[CacheBackend] = Depends(get_entity_cache),
+) -> Response:
+    service = BatchGetProducts(product_repository, cache)
+    result = await service.execute(body.ids, parse_fields(fields, ProductResponse))
+    return PydanticResponse(result)
+
+
+@router.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
-    product_repository: ProductRepository = Depends(get_product_repository),
-) -> ProductResponse:
-    service = GetProduct(product_repository)
-    return await service.execute(product_id)
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,price,quantity. Only "
+        "these columns are read from the database.",
+    ),
+    product_repository: ProductRepository = Depends(get_read_product_repository),
+    cache: Optional[CacheBackend] = Depends(get_read_cache),
+) -> Response:
+    selected_fields = parse_fields(fields, ProductResponse)
+    service = GetProduct(product_repository, cache)
+    product = await service.execute(product_id, selected_fields)
+
+    validators = entity_validators("product", product.id, product.updated_at, selected_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    return PydanticResponse(product, headers=validators.headers())
 
 
-@router.put("/products/{product_id}")
+@router.put("/products/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
     product_repository: ProductRepository = Depends(get_product_repository),
-    catalog_repository: CatalogRepository = Depends(get_catalog_repository),
-) -> ProductResponse:
-    service = UpdateProduct(product_repository, catalog_repository)
-    return await service.execute(product_id, product_data)
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+    cache: Optional[CacheBackend] = Depends(get_invalidating_cache),
+) -> Response:
+    service = UpdateProduct(product_repository, stats_repository, cache)
+    return PydanticResponse(await service.execute(product_id, product_data))
+
+
+@router.post(
+    "/products/{product_id}/adjust",
+    response_model=ProductResponse,
+    responses={202: {"description": "Adjustment queued in the write-behind buffer"}},
+)
+async def adjust_product_quantity(
+    product_id: int,
+    adjustment: ProductQuantityAdjust,
+    product_repository: ProductRepository = Depends(get_product_repository),
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+    cache: Optional[CacheBackend] = Depends(get_invalidating_cache),
+    buffer: Optional[QuantityWriteBuffer] = Depends(get_quantity_buffer),
+) -> Response:
+    service = AdjustProductQuantity(product_repository, stats_repository, cache, buffer)
+    product = await service.execute(product_id, adjustment)
+    if product is None:
+        return Response(status_code=202)
+    return PydanticResponse(product)
 
 
 @router.delete("/products/{product_id}", status_code=204)
 async def delete_product(
     product_id: int,
     product_repository: ProductRepository = Depends(get_product_repository),
+    stats_repository: CatalogStatsRepository = Depends(get_catalog_stats_repository),
+    cache: Optional[CacheBackend] = Depends(get_invalidating_cache),
 ) -> None:
-    service = DeleteProduct(product_repository)
+    service = DeleteProduct(product_repository, stats_repository, cache)
     await service.execute(product_id)
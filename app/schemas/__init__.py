@@ -1,13 +1,43 @@
-from app.schemas.catalog import CatalogCreate, CatalogUpdate, CatalogResponse, CatalogListResponse
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.schemas.base import BatchGetRequest
+from app.schemas.catalog import (
+    CatalogCreate,
+    CatalogUpdate,
+    CatalogResponse,
+    CatalogListResponse,
+    CatalogStatsResponse,
+    CatalogExpandedResponse,
+    CatalogExpandedListResponse,
+    CatalogBatchGetResponse,
+)
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductQuantityAdjust,
+    ProductResponse,
+    ProductListResponse,
+    ProductBatchGetResponse,
+    ProductFilters,
+    ProductBulkRowError,
+    ProductBulkResponse,
+)
 
 __all__ = [
+    "BatchGetRequest",
     "CatalogCreate",
     "CatalogUpdate",
     "CatalogResponse",
     "CatalogListResponse",
+    "CatalogStatsResponse",
+    "CatalogExpandedResponse",
+    "CatalogExpandedListResponse",
+    "CatalogBatchGetResponse",
     "ProductCreate",
     "ProductUpdate",
+    "ProductQuantityAdjust",
     "ProductResponse",
     "ProductListResponse",
+    "ProductBatchGetResponse",
+    "ProductFilters",
+    "ProductBulkRowError",
+    "ProductBulkResponse",
 ]
@@ -1,5 +1,17 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
+
+BATCH_GET_MAX_IDS = 200
 
 
 class BaseSchema(BaseModel):
     model_config = {"from_attributes": True}
+
+
+class BatchGetRequest(BaseSchema):
+    ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_GET_MAX_IDS,
+        description="Ids to fetch; items come back in this order, duplicates once",
+    )
@@ -1,8 +1,25 @@
 from pydantic import Field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.schemas.base import BaseSchema
+from app.schemas.product import ProductResponse
+
+CatalogInclude = Literal["products", "product_count", "stats"]
+CATALOG_INCLUDES: tuple[CatalogInclude, ...] = ("products", "product_count", "stats")
+
+CatalogSort = Literal[
+    "created_at",
+    "-created_at",
+    "product_count",
+    "-product_count",
+    "total_units",
+    "-total_units",
+    "inventory_value",
+    "-inventory_value",
+]
+# sorts on a catalog_stats column; lists sorted by one of them embed the stats
+CATALOG_STATS_SORTS = ("product_count", "total_units", "inventory_value")
 
 
 class CatalogBase(BaseSchema):
@@ -25,8 +42,47 @@ class CatalogResponse(CatalogBase):
     updated_at: datetime
 
 
+class CatalogStatsResponse(BaseSchema):
+    catalog_id: int
+    product_count: int = Field(..., description="Number of products in the catalog")
+    total_units: int = Field(..., description="Sum of the products' quantities")
+    inventory_value: float = Field(..., description="Sum of price * quantity over the products")
+    updated_at: datetime
+
+
+class CatalogExpandedResponse(CatalogResponse):
+    """A catalog with the related data asked for with ``include=``; the rest is left out."""
+
+    product_count: Optional[int] = Field(
+        None,
+        exclude_if=lambda value: value is None,
+        description="Number of products in the catalog (include=product_count)",
+    )
+    products: Optional[List[ProductResponse]] = Field(
+        None,
+        exclude_if=lambda value: value is None,
+        description="Newest products of the catalog, up to products_limit (include=products)",
+    )
+    stats: Optional[CatalogStatsResponse] = Field(
+        None,
+        exclude_if=lambda value: value is None,
+        description="Inventory statistics of the catalog (include=stats)",
+    )
+
+
 class CatalogListResponse(BaseSchema):
     items: List[CatalogResponse]
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = Field(False, description="Whether total is an estimate")
     page: int = 1
     page_size: int = 10
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class CatalogExpandedListResponse(CatalogListResponse):
+    items: List[CatalogExpandedResponse]
+
+
+class CatalogBatchGetResponse(BaseSchema):
+    items: List[CatalogResponse]
+    missing: List[int] = Field(..., description="Requested ids that do not exist")
@@ -1,6 +1,6 @@
 from pydantic import Field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.schemas.base import BaseSchema
 
@@ -24,7 +24,16 @@ class ProductUpdate(BaseSchema):
     catalog_id: Optional[int] = Field(None, description="Catalog ID to assign product to")
 
 
+class ProductQuantityAdjust(BaseSchema):
+    delta: int = Field(..., description="Signed change to apply to the quantity")
+    allow_negative: bool = Field(
+        False, description="Apply the change even if it takes the quantity below zero"
+    )
+
+
 class ProductResponse(ProductBase):
+    # adjustments with allow_negative can oversell a product
+    quantity: int = Field(0, description="Product quantity")
     id: int
     catalog_id: Optional[int]
     created_at: datetime
@@ -33,6 +42,46 @@ class ProductResponse(ProductBase):
 
 class ProductListResponse(BaseSchema):
     items: List[ProductResponse]
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = Field(False, description="Whether total is an estimate")
     page: int = 1
     page_size: int = 10
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class ProductBatchGetResponse(BaseSchema):
+    items: List[ProductResponse]
+    missing: List[int] = Field(..., description="Requested ids that do not exist")
+
+
+ProductSort = Literal[
+    "created_at", "-created_at", "price", "-price", "name", "-name", "quantity", "-quantity"
+]
+
+
+class ProductFilters(BaseSchema):
+    min_price: Optional[float] = Field(None, ge=0, description="Minimum price (inclusive)")
+    max_price: Optional[float] = Field(None, ge=0, description="Maximum price (inclusive)")
+    in_stock: Optional[bool] = Field(
+        None, description="Only products in stock (quantity > 0), or only sold out ones if false"
+    )
+    low_stock: Optional[int] = Field(
+        None, ge=0, description="Only products with quantity at or below this threshold"
+    )
+    name_prefix: Optional[str] = Field(
+        None, min_length=1, max_length=255, description="Only products whose name starts with this"
+    )
+    sort: ProductSort = Field(
+        "-created_at", description="Sort field, prefixed with - for descending order"
+    )
+
+
+class ProductBulkRowError(BaseSchema):
+    index: int = Field(..., description="Zero-based position of the row in the request body")
+    error: str
+
+
+class ProductBulkResponse(BaseSchema):
+    created: int
+    failed: int
+    errors: List[ProductBulkRowError]
@@ -2,6 +2,7 @@ from app.services.catalog import (
     CreateCatalog,
     GetCatalog,
     GetCatalogList,
+    GetCatalogListVersion,
     UpdateCatalog,
     DeleteCatalog,
 )
@@ -9,19 +10,28 @@ from app.services.product import (
     CreateProduct,
     GetProduct,
     GetProductList,
+    GetProductListVersion,
     UpdateProduct,
     DeleteProduct,
+    BulkCreateProducts,
+    ExportProducts,
+    SearchProducts,
 )
 
 __all__ = [
     "CreateCatalog",
     "GetCatalog",
     "GetCatalogList",
+    "GetCatalogListVersion",
     "UpdateCatalog",
     "DeleteCatalog",
     "CreateProduct",
     "GetProduct",
     "GetProductList",
+    "GetProductListVersion",
     "UpdateProduct",
     "DeleteProduct",
+    "BulkCreateProducts",
+    "ExportProducts",
+    "SearchProducts",
 ]
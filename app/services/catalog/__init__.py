@@ -1,13 +1,25 @@
 from app.services.catalog.create_catalog import CreateCatalog
 from app.services.catalog.get_catalog import GetCatalog
 from app.services.catalog.get_catalog_list import GetCatalogList
+from app.services.catalog.get_catalog_list_version import GetCatalogListVersion
 from app.services.catalog.update_catalog import UpdateCatalog
 from app.services.catalog.delete_catalog import DeleteCatalog
+from app.services.catalog.batch_get_catalogs import BatchGetCatalogs
+from app.services.catalog.expand_catalogs import ExpandCatalogs
+from app.services.catalog.get_catalog_stats import GetCatalogStats
+from app.services.catalog.rebuild_catalog_stats import RebuildCatalogStats
+from app.services.catalog.roll_up_catalog_stats import RollUpCatalogStats
 
 __all__ = [
     "CreateCatalog",
     "GetCatalog",
     "GetCatalogList",
+    "GetCatalogListVersion",
     "UpdateCatalog",
     "DeleteCatalog",
+    "BatchGetCatalogs",
+    "ExpandCatalogs",
+    "GetCatalogStats",
+    "RebuildCatalogStats",
+    "RollUpCatalogStats",
 ]
@@ -0,0 +1,45 @@
+import logging
+from typing import List, Optional
+
+from app.cache import CacheBackend, catalog_key
+from app.fieldsets import Fields, list_response_model, response_model
+from app.schemas.catalog import CatalogBatchGetResponse, CatalogResponse
+from app.repositories.catalog_repository import CatalogRepository
+
+logger = logging.getLogger(__name__)
+
+
+class BatchGetCatalogs:
+    def __init__(self, repository: CatalogRepository, cache: Optional[CacheBackend] = None) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    async def execute(
+        self, catalog_ids: List[int], fields: Optional[Fields] = None
+    ) -> CatalogBatchGetResponse:
+        ids = list(dict.fromkeys(catalog_ids))
+        logger.debug("Batch getting %s catalogs", len(ids))
+        model = response_model(CatalogResponse, fields)
+
+        found: dict[int, CatalogResponse] = {}
+        if self.cache is not None:
+            for catalog_id in ids:
+                cached = self.cache.get(catalog_key(catalog_id))
+                if cached is not None:
+                    found[catalog_id] = model.model_validate(cached)
+
+        # everything the cache could not serve is read with a single IN query
+        misses = [catalog_id for catalog_id in ids if catalog_id not in found]
+        for catalog in await self.repository.get_by_ids(misses, fields):
+            found[catalog.id] = catalog
+            if self.cache is not None and not fields:
+                self.cache.set(catalog_key(catalog.id), catalog)
+
+        missing = [catalog_id for catalog_id in ids if catalog_id not in found]
+        if missing:
+            logger.debug("Catalogs not found: %s", missing)
+        response = list_response_model(CatalogBatchGetResponse, CatalogResponse, fields)
+        return response(
+            items=[found[catalog_id] for catalog_id in ids if catalog_id in found],
+            missing=missing,
+        )
@@ -2,21 +2,26 @@ import logging
 
 from app.schemas.catalog import CatalogCreate, CatalogResponse
 from app.repositories.catalog_repository import CatalogRepository
-from app.exceptions import ConflictError
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.exceptions import ConflictError, translate_integrity_errors
 
 logger = logging.getLogger(__name__)
 
 
 class CreateCatalog:
-    def __init__(self, repository: CatalogRepository) -> None:
+    def __init__(
+        self, repository: CatalogRepository, stats_repository: CatalogStatsRepository
+    ) -> None:
         self.repository = repository
+        self.stats_repository = stats_repository
 
     async def execute(self, catalog_data: CatalogCreate) -> CatalogResponse:
-        logger.info(f"Creating catalog: {catalog_data.name}")
+        logger.info("Creating catalog: %s", catalog_data.name)
 
-        existing = await self.repository.get_by_name(catalog_data.name)
-        if existing:
-            logger.warning(f"Catalog with name '{catalog_data.name}' already exists")
-            raise ConflictError(f"Catalog with name '{catalog_data.name}' already exists")
-
-        return await self.repository.create(catalog_data)
+        # the unique index on name reports a duplicate
+        with translate_integrity_errors(
+            unique=lambda: ConflictError(f"Catalog with name '{catalog_data.name}' already exists")
+        ):
+            catalog = await self.repository.create(catalog_data)
+        await self.stats_repository.create(catalog.id)
+        return catalog
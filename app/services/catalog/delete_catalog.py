@@ -1,5 +1,7 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, catalog_key
 from app.repositories.catalog_repository import CatalogRepository
 from app.exceptions import NotFoundError
 
@@ -7,16 +9,22 @@ logger = logging.getLogger(__name__)
 
 
 class DeleteCatalog:
-    def __init__(self, repository: CatalogRepository) -> None:
+    def __init__(self, repository: CatalogRepository, cache: Optional[CacheBackend] = None) -> None:
         self.repository = repository
+        self.cache = cache
 
     async def execute(self, catalog_id: int) -> None:
-        logger.info(f"Deleting catalog with id: {catalog_id}")
+        logger.info("Deleting catalog with id: %s", catalog_id)
 
-        catalog = await self.repository.get_by_id(catalog_id)
-        if not catalog:
-            logger.warning(f"Catalog with id {catalog_id} not found")
+        deleted = await self.repository.delete(catalog_id)
+        if not deleted:
+            logger.warning("Catalog with id %s not found", catalog_id)
             raise NotFoundError("Catalog", catalog_id)
 
-        await self.repository.delete(catalog_id)
-        logger.info(f"Catalog {catalog_id} deleted successfully")
+        if self.cache is not None:
+            # the catalog's products are removed with it, so drop their cached entries too
+            self.cache.delete(catalog_key(catalog_id))
+            self.cache.delete_where(
+                lambda key, value: key[0] == "product" and value.catalog_id == catalog_id
+            )
+        logger.info("Catalog %s deleted successfully", catalog_id)
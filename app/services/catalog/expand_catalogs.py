@@ -0,0 +1,64 @@
+import logging
+from typing import List, Optional, Sequence
+
+from app.fieldsets import Fields, response_model
+from app.schemas.catalog import CatalogExpandedResponse, CatalogResponse
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.repositories.product_repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+
+def expanded_model(fields: Optional[Fields], include: Fields) -> type[CatalogExpandedResponse]:
+    # included data is part of a sparse fieldset even when not listed in fields=
+    return response_model(CatalogExpandedResponse, fields and fields + include)  # type: ignore[return-value]
+
+
+class ExpandCatalogs:
+    """Embed ``include=`` data into a page of catalogs with one query per include."""
+
+    def __init__(
+        self, product_repository: ProductRepository, stats_repository: CatalogStatsRepository
+    ) -> None:
+        self.product_repository = product_repository
+        self.stats_repository = stats_repository
+
+    async def execute(
+        self,
+        catalogs: Sequence[CatalogResponse],
+        include: Fields,
+        fields: Optional[Fields] = None,
+        products_limit: int = 10,
+    ) -> List[CatalogExpandedResponse]:
+        logger.debug("Expanding %s catalogs with %s", len(catalogs), include)
+        catalog_ids = [catalog.id for catalog in catalogs]
+
+        counts: Optional[dict[int, int]] = None
+        if "product_count" in include:
+            counts = await self.product_repository.count_by_catalog_ids(catalog_ids)
+        products = None
+        if "products" in include:
+            products = await self.product_repository.get_latest_by_catalog_ids(
+                catalog_ids, products_limit
+            )
+        stats = None
+        # lists sorted by a statistic already carry the stats they were ordered by
+        missing_stats = [
+            catalog.id for catalog in catalogs if getattr(catalog, "stats", None) is None
+        ]
+        if "stats" in include and missing_stats:
+            stats = await self.stats_repository.get_by_catalog_ids(missing_stats)
+
+        model = expanded_model(fields, include)
+        return [
+            model.model_validate(
+                {
+                    **dict(catalog),
+                    "product_count": None if counts is None else counts.get(catalog.id, 0),
+                    "products": None if products is None else products.get(catalog.id, []),
+                    "stats": getattr(catalog, "stats", None)
+                    or (stats.get(catalog.id) if stats is not None else None),
+                }
+            )
+            for catalog in catalogs
+        ]
@@ -1,20 +1,53 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, catalog_key
+from app.fieldsets import Fields, response_model
 from app.schemas.catalog import CatalogResponse
 from app.repositories.catalog_repository import CatalogRepository
+from app.services.catalog.expand_catalogs import ExpandCatalogs
 from app.exceptions import NotFoundError
 
 logger = logging.getLogger(__name__)
 
 
 class GetCatalog:
-    def __init__(self, repository: CatalogRepository) -> None:
+    def __init__(
+        self,
+        repository: CatalogRepository,
+        cache: Optional[CacheBackend] = None,
+        expand: Optional[ExpandCatalogs] = None,
+    ) -> None:
         self.repository = repository
+        self.cache = cache
+        self.expand = expand
 
-    async def execute(self, catalog_id: int) -> CatalogResponse:
-        logger.debug(f"Getting catalog with id: {catalog_id}")
-        catalog = await self.repository.get_by_id(catalog_id)
+    async def execute(
+        self,
+        catalog_id: int,
+        fields: Optional[Fields] = None,
+        include: Fields = (),
+        products_limit: int = 10,
+    ) -> CatalogResponse:
+        catalog = await self._get(catalog_id, fields)
+        if include and self.expand is not None:
+            [catalog] = await self.expand.execute([catalog], include, fields, products_limit)
+        return catalog
+
+    async def _get(self, catalog_id: int, fields: Optional[Fields]) -> CatalogResponse:
+        logger.debug("Getting catalog with id: %s", catalog_id)
+        if self.cache is not None:
+            cached = self.cache.get(catalog_key(catalog_id))
+            if cached is not None:
+                # a cached full catalog can serve any field set
+                return response_model(CatalogResponse, fields).model_validate(cached)
+
+        catalog = await self.repository.get_by_id(catalog_id, fields)
         if not catalog:
-            logger.warning(f"Catalog with id {catalog_id} not found")
+            logger.warning("Catalog with id %s not found", catalog_id)
             raise NotFoundError("Catalog", catalog_id)
+
+        # only full rows are cached
+        if self.cache is not None and not fields:
+            self.cache.set(catalog_key(catalog_id), catalog)
         return catalog
@@ -1,15 +1,28 @@
 from typing import Optional
 import logging
 
-from app.schemas.catalog import CatalogListResponse
+from app.fieldsets import Fields, list_response_model, partial_list_model
+from app.schemas.catalog import (
+    CATALOG_STATS_SORTS,
+    CatalogListResponse,
+    CatalogResponse,
+    CatalogSort,
+)
 from app.repositories.catalog_repository import CatalogRepository
+from app.services.catalog.expand_catalogs import ExpandCatalogs, expanded_model
+from app.pagination import DEFAULT_SORT, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
 
 class GetCatalogList:
-    def __init__(self, repository: CatalogRepository) -> None:
+    def __init__(
+        self,
+        repository: CatalogRepository,
+        expand: Optional[ExpandCatalogs] = None,
+    ) -> None:
         self.repository = repository
+        self.expand = expand
 
     async def execute(
         self,
@@ -17,18 +30,70 @@ class GetCatalogList:
         page_size: int = 10,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        estimate_total: bool = False,
+        fields: Optional[Fields] = None,
+        include: Fields = (),
+        products_limit: int = 10,
+        sort: CatalogSort = DEFAULT_SORT,
     ) -> CatalogListResponse:
-        logger.debug(f"Getting catalogs - page: {page}, page_size: {page_size}")
-        catalogs, total = await self.repository.get_all(
-            page=page,
-            page_size=page_size,
-            skip=skip,
-            limit=limit,
-        )
+        logger.debug("Getting catalogs - page: %s, page_size: %s", page, page_size)
+
+        if include_total is None:
+            include_total = cursor is None
+        exact_total = include_total and not estimate_total
+
+        total = None
+        if cursor is not None:
+            catalogs, has_more = await self.repository.get_page_after(
+                page_size=limit if limit is not None else page_size,
+                after=decode_cursor(cursor, sort) if cursor else None,
+                fields=fields,
+                sort=sort,
+            )
+            if exact_total:
+                total = await self.repository.count()
+        else:
+            catalogs, total = await self.repository.get_all(
+                page=page,
+                page_size=page_size,
+                skip=skip,
+                limit=limit,
+                include_total=exact_total,
+                fields=fields,
+                sort=sort,
+            )
+            if total is not None:
+                offset = skip if skip is not None else (page - 1) * page_size
+                has_more = offset + len(catalogs) < total
+            else:
+                has_more = len(catalogs) == (limit if limit is not None else page_size)
+
+        if include_total and estimate_total:
+            total = await self.repository.estimate_count()
+
+        sort_field = sort.lstrip("-")
+        next_cursor = None
+        if has_more and catalogs:
+            last = catalogs[-1]
+            source = last.stats if sort_field in CATALOG_STATS_SORTS else last  # type: ignore[attr-defined]
+            next_cursor = encode_cursor(getattr(source, sort_field), last.id, sort)
 
-        return CatalogListResponse(
+        if sort_field in CATALOG_STATS_SORTS and "stats" not in include:
+            # the rows already carry their stats, shown as the column the list is sorted by
+            include = (*include, "stats")
+        if include and self.expand is not None:
+            catalogs = await self.expand.execute(catalogs, include, fields, products_limit)
+        if include:
+            list_model = partial_list_model(CatalogListResponse, expanded_model(fields, include))
+        else:
+            list_model = list_response_model(CatalogListResponse, CatalogResponse, fields)
+        return list_model(
             items=catalogs,
             total=total,
+            total_estimated=include_total and estimate_total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+import logging
+
+from app.repositories.catalog_repository import CatalogRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GetCatalogListVersion:
+    def __init__(self, repository: CatalogRepository) -> None:
+        self.repository = repository
+
+    async def execute(self) -> tuple[Optional[datetime], int]:
+        logger.debug("Getting catalog list version")
+        return await self.repository.get_version()
@@ -0,0 +1,21 @@
+import logging
+
+from app.schemas.catalog import CatalogStatsResponse
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class GetCatalogStats:
+    def __init__(self, repository: CatalogStatsRepository) -> None:
+        self.repository = repository
+
+    async def execute(self, catalog_id: int) -> CatalogStatsResponse:
+        logger.debug("Getting stats of catalog %s", catalog_id)
+        # every catalog has a stats row, so a missing row means a missing catalog
+        stats = await self.repository.get(catalog_id)
+        if not stats:
+            logger.warning("Catalog with id %s not found", catalog_id)
+            raise NotFoundError("Catalog", catalog_id)
+        return stats
@@ -0,0 +1,24 @@
+import logging
+from typing import Optional
+
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class RebuildCatalogStats:
+    """Recompute catalog stats from the products, repairing any drift from the deltas."""
+
+    def __init__(
+        self, catalog_repository: CatalogRepository, stats_repository: CatalogStatsRepository
+    ) -> None:
+        self.catalog_repository = catalog_repository
+        self.stats_repository = stats_repository
+
+    async def execute(self, catalog_id: Optional[int] = None) -> int:
+        if catalog_id is not None and not await self.catalog_repository.get_by_id(catalog_id):
+            logger.warning("Catalog with id %s not found", catalog_id)
+            raise NotFoundError("Catalog", catalog_id)
+        return await self.stats_repository.rebuild(catalog_id)
@@ -0,0 +1,19 @@
+import logging
+
+from app.config import settings
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RollUpCatalogStats:
+    """Fold the stats deltas recorded by quantity adjustments into the catalog stats."""
+
+    def __init__(self, stats_repository: CatalogStatsRepository) -> None:
+        self.stats_repository = stats_repository
+
+    async def execute(self) -> int:
+        rolled_up = await self.stats_repository.roll_up(settings.CATALOG_STATS_ROLLUP_BATCH_SIZE)
+        if rolled_up:
+            logger.debug("Rolled up %s catalog stats deltas", rolled_up)
+        return rolled_up
@@ -1,32 +1,34 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, catalog_key
 from app.schemas.catalog import CatalogUpdate, CatalogResponse
 from app.repositories.catalog_repository import CatalogRepository
-from app.exceptions import NotFoundError, ConflictError
+from app.exceptions import NotFoundError, ConflictError, translate_integrity_errors
 
 logger = logging.getLogger(__name__)
 
 
 class UpdateCatalog:
-    def __init__(self, repository: CatalogRepository) -> None:
+    def __init__(self, repository: CatalogRepository, cache: Optional[CacheBackend] = None) -> None:
         self.repository = repository
+        self.cache = cache
 
     async def execute(
         self,
         catalog_id: int,
         catalog_data: CatalogUpdate,
     ) -> CatalogResponse:
-        logger.info(f"Updating catalog with id: {catalog_id}")
-
-        catalog = await self.repository.get_by_id(catalog_id)
-        if not catalog:
-            logger.warning(f"Catalog with id {catalog_id} not found")
+        logger.info("Updating catalog with id: %s", catalog_id)
+
+        with translate_integrity_errors(
+            unique=lambda: ConflictError(f"Catalog with name '{catalog_data.name}' already exists")
+        ):
+            updated = await self.repository.update(catalog_id, catalog_data)
+        if not updated:
+            logger.warning("Catalog with id %s not found", catalog_id)
             raise NotFoundError("Catalog", catalog_id)
 
-        if catalog_data.name and catalog_data.name != catalog.name:
-            existing = await self.repository.get_by_name(catalog_data.name)
-            if existing:
-                logger.warning(f"Catalog with name '{catalog_data.name}' already exists")
-                raise ConflictError(f"Catalog with name '{catalog_data.name}' already exists")
-
-        return await self.repository.update(catalog_id, catalog_data)
+        if self.cache is not None:
+            self.cache.delete(catalog_key(catalog_id))
+        return updated
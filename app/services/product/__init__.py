@@ -1,13 +1,27 @@
 from app.services.product.create_product import CreateProduct
 from app.services.product.get_product import GetProduct
 from app.services.product.get_product_list import GetProductList
+from app.services.product.get_product_list_version import GetProductListVersion
 from app.services.product.update_product import UpdateProduct
 from app.services.product.delete_product import DeleteProduct
+from app.services.product.bulk_create_products import BulkCreateProducts
+from app.services.product.export_products import ExportProducts
+from app.services.product.search_products import SearchProducts
+from app.services.product.batch_get_products import BatchGetProducts
+from app.services.product.adjust_product_quantity import AdjustProductQuantity
+from app.services.product.flush_quantity_adjustments import FlushQuantityAdjustments
 
 __all__ = [
     "CreateProduct",
     "GetProduct",
     "GetProductList",
+    "GetProductListVersion",
     "UpdateProduct",
     "DeleteProduct",
+    "BulkCreateProducts",
+    "ExportProducts",
+    "SearchProducts",
+    "BatchGetProducts",
+    "AdjustProductQuantity",
+    "FlushQuantityAdjustments",
 ]
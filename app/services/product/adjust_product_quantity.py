@@ -0,0 +1,66 @@
+import logging
+from typing import Optional
+
+from app.cache import CacheBackend, product_key
+from app.schemas.product import ProductQuantityAdjust, ProductResponse
+from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.exceptions import ConflictError, NotFoundError
+from app.write_buffer import QuantityWriteBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class AdjustProductQuantity:
+    """Change a product's quantity by a delta, safe under concurrent adjustments."""
+
+    def __init__(
+        self,
+        product_repository: ProductRepository,
+        stats_repository: CatalogStatsRepository,
+        cache: Optional[CacheBackend] = None,
+        buffer: Optional[QuantityWriteBuffer] = None,
+    ) -> None:
+        self.product_repository = product_repository
+        self.stats_repository = stats_repository
+        self.cache = cache
+        self.buffer = buffer
+
+    async def execute(
+        self, product_id: int, adjustment: ProductQuantityAdjust
+    ) -> Optional[ProductResponse]:
+        """Apply the adjustment; None when it was only queued in the write-behind buffer."""
+        logger.info("Adjusting quantity of product %s by %s", product_id, adjustment.delta)
+
+        if self.buffer is not None and self.buffer.accepts(adjustment):
+            return await self.buffer.add(product_id, adjustment)
+
+        adjusted = await self.product_repository.adjust_quantity(
+            product_id, adjustment.delta, adjustment.allow_negative
+        )
+        if not adjusted:
+            # only a failed adjustment pays for finding out why
+            current = await self.product_repository.get_by_id(product_id, ("quantity",))
+            if not current:
+                logger.warning("Product with id %s not found", product_id)
+                raise NotFoundError("Product", product_id)
+            logger.warning(
+                "Product %s has %s units, cannot adjust by %s",
+                product_id,
+                current.quantity,
+                adjustment.delta,
+            )
+            raise ConflictError(
+                f"Product with id {product_id} has {current.quantity} units, "
+                f"cannot adjust by {adjustment.delta}"
+            )
+
+        # the row before the change is fully known from the row after it and the delta
+        previous = adjusted.model_copy(update={"quantity": adjusted.quantity - adjustment.delta})
+        # recorded rather than applied: updating the catalog's stats row would hold its lock
+        # until commit and line up every concurrent adjustment in the catalog behind it
+        await self.stats_repository.record(added=[adjusted], removed=[previous])
+
+        if self.cache is not None:
+            self.cache.delete(product_key(product_id))
+        return adjusted
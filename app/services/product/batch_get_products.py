@@ -0,0 +1,45 @@
+import logging
+from typing import List, Optional
+
+from app.cache import CacheBackend, product_key
+from app.fieldsets import Fields, list_response_model, response_model
+from app.schemas.product import ProductBatchGetResponse, ProductResponse
+from app.repositories.product_repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+
+class BatchGetProducts:
+    def __init__(self, repository: ProductRepository, cache: Optional[CacheBackend] = None) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    async def execute(
+        self, product_ids: List[int], fields: Optional[Fields] = None
+    ) -> ProductBatchGetResponse:
+        ids = list(dict.fromkeys(product_ids))
+        logger.debug("Batch getting %s products", len(ids))
+        model = response_model(ProductResponse, fields)
+
+        found: dict[int, ProductResponse] = {}
+        if self.cache is not None:
+            for product_id in ids:
+                cached = self.cache.get(product_key(product_id))
+                if cached is not None:
+                    found[product_id] = model.model_validate(cached)
+
+        # everything the cache could not serve is read with a single IN query
+        misses = [product_id for product_id in ids if product_id not in found]
+        for product in await self.repository.get_by_ids(misses, fields):
+            found[product.id] = product
+            if self.cache is not None and not fields:
+                self.cache.set(product_key(product.id), product)
+
+        missing = [product_id for product_id in ids if product_id not in found]
+        if missing:
+            logger.debug("Products not found: %s", missing)
+        response = list_response_model(ProductBatchGetResponse, ProductResponse, fields)
+        return response(
+            items=[found[product_id] for product_id in ids if product_id in found],
+            missing=missing,
+        )
@@ -0,0 +1,127 @@
+import json
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.exceptions import BadRequestError
+from app.schemas.product import ProductBulkResponse, ProductBulkRowError, ProductCreate
+from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def _ndjson_rows(
+    body: AsyncIterable[bytes], errors: list[ProductBulkRowError]
+) -> AsyncIterator[tuple[int, ProductCreate]]:
+    index = 0
+    async for line in _lines(body):
+        if line.strip():
+            try:
+                yield index, ProductCreate.model_validate_json(line)
+            except ValidationError as exc:
+                errors.append(ProductBulkRowError(index=index, error=_format_validation_error(exc)))
+        index += 1
+
+
+async def _json_rows(
+    body: AsyncIterable[bytes], errors: list[ProductBulkRowError]
+) -> AsyncIterator[tuple[int, ProductCreate]]:
+    try:
+        payload = json.loads(b"".join([chunk async for chunk in body]))
+    except ValueError:
+        raise BadRequestError("Request body is not valid JSON") from None
+    if not isinstance(payload, list):
+        raise BadRequestError("Request body must be a JSON array of products")
+    for index, item in enumerate(payload):
+        try:
+            yield index, ProductCreate.model_validate(item)
+        except ValidationError as exc:
+            errors.append(ProductBulkRowError(index=index, error=_format_validation_error(exc)))
+
+
+class BulkCreateProducts:
+    """Create products from a JSON array or an NDJSON stream, reporting invalid rows by index.
+
+    NDJSON rows are validated as they arrive and inserted every ``BULK_INSERT_BATCH_SIZE``
+    rows, so a large feed is never held in memory as a whole.
+    """
+
+    def __init__(
+        self,
+        product_repository: ProductRepository,
+        catalog_repository: CatalogRepository,
+        stats_repository: CatalogStatsRepository,
+    ) -> None:
+        self.product_repository = product_repository
+        self.catalog_repository = catalog_repository
+        self.stats_repository = stats_repository
+
+    async def execute(
+        self, body: AsyncIterable[bytes], ndjson: bool = False
+    ) -> ProductBulkResponse:
+        errors: list[ProductBulkRowError] = []
+        rows = _ndjson_rows(body, errors) if ndjson else _json_rows(body, errors)
+        # catalogs confirmed by an earlier batch are not looked up again
+        catalog_ids: set[int] = set()
+
+        created = 0
+        batch: list[tuple[int, ProductCreate]] = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= settings.BULK_INSERT_BATCH_SIZE:
+                created += await self._insert(batch, catalog_ids, errors)
+                batch = []
+        created += await self._insert(batch, catalog_ids, errors)
+
+        logger.info("Bulk created %s products, %s rows failed", created, len(errors))
+        errors.sort(key=lambda error: error.index)
+        return ProductBulkResponse(created=created, failed=len(errors), errors=errors)
+
+    async def _insert(
+        self,
+        batch: list[tuple[int, ProductCreate]],
+        catalog_ids: set[int],
+        errors: list[ProductBulkRowError],
+    ) -> int:
+        if not batch:
+            return 0
+        referenced = {row.catalog_id for _, row in batch if row.catalog_id is not None}
+        catalog_ids |= await self.catalog_repository.get_existing_ids(referenced - catalog_ids)
+
+        valid: list[ProductCreate] = []
+        for index, row in batch:
+            if row.catalog_id is not None and row.catalog_id not in catalog_ids:
+                errors.append(
+                    ProductBulkRowError(
+                        index=index, error=f"Catalog with id {row.catalog_id} not found"
+                    )
+                )
+            else:
+                valid.append(row)
+
+        created = await self.product_repository.bulk_create(
+            valid, batch_size=settings.BULK_INSERT_BATCH_SIZE
+        )
+        await self.stats_repository.apply(added=valid)
+        return created
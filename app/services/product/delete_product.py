@@ -1,22 +1,34 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, product_key
 from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
 from app.exceptions import NotFoundError
 
 logger = logging.getLogger(__name__)
 
 
 class DeleteProduct:
-    def __init__(self, repository: ProductRepository) -> None:
+    def __init__(
+        self,
+        repository: ProductRepository,
+        stats_repository: CatalogStatsRepository,
+        cache: Optional[CacheBackend] = None,
+    ) -> None:
         self.repository = repository
+        self.stats_repository = stats_repository
+        self.cache = cache
 
     async def execute(self, product_id: int) -> None:
-        logger.info(f"Deleting product with id: {product_id}")
+        logger.info("Deleting product with id: %s", product_id)
 
-        product = await self.repository.get_by_id(product_id)
-        if not product:
-            logger.warning(f"Product with id {product_id} not found")
+        deleted = await self.repository.delete(product_id)
+        if not deleted:
+            logger.warning("Product with id %s not found", product_id)
             raise NotFoundError("Product", product_id)
+        await self.stats_repository.apply(removed=[deleted])
 
-        await self.repository.delete(product_id)
-        logger.info(f"Product {product_id} deleted successfully")
+        if self.cache is not None:
+            self.cache.delete(product_key(product_id))
+        logger.info("Product %s deleted successfully", product_id)
@@ -0,0 +1,80 @@
+import csv
+import io
+import logging
+from collections.abc import AsyncIterator
+from typing import Literal, Optional
+
+from pydantic_core import to_json
+
+from app.config import settings
+from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_repository import CatalogRepository
+from app.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "price",
+    "quantity",
+    "catalog_id",
+    "created_at",
+    "updated_at",
+]
+
+
+class ExportProducts:
+    def __init__(
+        self, product_repository: ProductRepository, catalog_repository: CatalogRepository
+    ) -> None:
+        self.product_repository = product_repository
+        self.catalog_repository = catalog_repository
+
+    async def execute(
+        self,
+        catalog_id: Optional[int] = None,
+        export_format: ExportFormat = "ndjson",
+    ) -> AsyncIterator[bytes]:
+        logger.info("Exporting products - catalog_id: %s, format: %s", catalog_id, export_format)
+
+        if catalog_id:
+            catalog = await self.catalog_repository.get_by_id(catalog_id)
+            if not catalog:
+                logger.warning("Catalog with id %s not found", catalog_id)
+                raise NotFoundError("Catalog", catalog_id)
+
+        if export_format == "csv":
+            return self._csv_chunks(catalog_id)
+        return self._ndjson_chunks(catalog_id)
+
+    async def _ndjson_chunks(self, catalog_id: Optional[int]) -> AsyncIterator[bytes]:
+        async for rows in self.product_repository.stream_rows(
+            catalog_id=catalog_id, chunk_size=settings.EXPORT_CHUNK_SIZE
+        ):
+            yield b"".join(to_json(dict(row)) + b"\n" for row in rows)
+
+    async def _csv_chunks(self, catalog_id: Optional[int]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+
+        async for rows in self.product_repository.stream_rows(
+            catalog_id=catalog_id, chunk_size=settings.EXPORT_CHUNK_SIZE
+        ):
+            writer.writerows(
+                [
+                    row[column].isoformat() if column.endswith("_at") else row[column]
+                    for column in EXPORT_COLUMNS
+                ]
+                for row in rows
+            )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,69 @@
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.cache import CacheBackend, product_key
+from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.services.product.adjust_product_quantity import AdjustProductQuantity
+from app.write_buffer import AdjustmentOutcome, Batch
+
+logger = logging.getLogger(__name__)
+
+
+class FlushQuantityAdjustments:
+    """Write a batch of buffered quantity adjustments, one merged delta per product."""
+
+    def __init__(
+        self,
+        product_repository: ProductRepository,
+        stats_repository: CatalogStatsRepository,
+        cache: Optional[CacheBackend] = None,
+    ) -> None:
+        self.product_repository = product_repository
+        self.stats_repository = stats_repository
+        self.cache = cache
+
+    async def execute(self, batch: Batch) -> dict[int, list[AdjustmentOutcome]]:
+        deltas = {
+            product_id: sum(entry.adjustment.delta for entry in entries)
+            for product_id, entries in batch.items()
+        }
+        # the below-zero guard applies to a product's merged delta
+        guarded = [
+            product_id
+            for product_id, entries in batch.items()
+            if not all(entry.adjustment.allow_negative for entry in entries)
+        ]
+        logger.info("Flushing quantity adjustments of %s products", len(deltas))
+
+        adjusted = await self.product_repository.adjust_quantities(deltas, guarded)
+        await self.stats_repository.record(
+            added=adjusted.values(),
+            removed=[
+                product.model_copy(update={"quantity": product.quantity - deltas[product.id]})
+                for product in adjusted.values()
+            ],
+        )
+
+        outcomes: dict[int, list[AdjustmentOutcome]] = {}
+        # a product left out was missing or failed the guard as a whole; replaying its
+        # adjustments one at a time lets the ones that fit through and tells the rest why
+        replay = AdjustProductQuantity(self.product_repository, self.stats_repository)
+        for product_id, entries in batch.items():
+            if product_id in adjusted:
+                outcomes[product_id] = [adjusted[product_id]] * len(entries)
+                continue
+            outcomes[product_id] = []
+            for entry in entries:
+                try:
+                    outcome: AdjustmentOutcome = await replay.execute(product_id, entry.adjustment)
+                except HTTPException as error:
+                    outcome = error
+                outcomes[product_id].append(outcome)
+
+        if self.cache is not None:
+            for product_id in batch:
+                self.cache.delete(product_key(product_id))
+        return outcomes
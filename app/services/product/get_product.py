@@ -1,5 +1,8 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, product_key
+from app.fieldsets import Fields, response_model
 from app.schemas.product import ProductResponse
 from app.repositories.product_repository import ProductRepository
 from app.exceptions import NotFoundError
@@ -8,13 +11,24 @@ logger = logging.getLogger(__name__)
 
 
 class GetProduct:
-    def __init__(self, repository: ProductRepository) -> None:
+    def __init__(self, repository: ProductRepository, cache: Optional[CacheBackend] = None) -> None:
         self.repository = repository
+        self.cache = cache
 
-    async def execute(self, product_id: int) -> ProductResponse:
-        logger.debug(f"Getting product with id: {product_id}")
-        product = await self.repository.get_by_id(product_id)
+    async def execute(self, product_id: int, fields: Optional[Fields] = None) -> ProductResponse:
+        logger.debug("Getting product with id: %s", product_id)
+        if self.cache is not None:
+            cached = self.cache.get(product_key(product_id))
+            if cached is not None:
+                # a cached full product can serve any field set
+                return response_model(ProductResponse, fields).model_validate(cached)
+
+        product = await self.repository.get_by_id(product_id, fields)
         if not product:
-            logger.warning(f"Product with id {product_id} not found")
+            logger.warning("Product with id %s not found", product_id)
             raise NotFoundError("Product", product_id)
+
+        # only full rows are cached
+        if self.cache is not None and not fields:
+            self.cache.set(product_key(product_id), product)
         return product
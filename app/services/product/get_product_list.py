@@ -1,10 +1,12 @@
 from typing import Optional
 import logging
 
-from app.schemas.product import ProductListResponse
+from app.fieldsets import Fields, list_response_model
+from app.schemas.product import ProductFilters, ProductListResponse, ProductResponse
 from app.repositories.product_repository import ProductRepository
 from app.repositories.catalog_repository import CatalogRepository
 from app.exceptions import NotFoundError
+from app.pagination import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -21,31 +23,82 @@ class GetProductList:
         catalog_id: Optional[int] = None,
         page: int = 1,
         page_size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        estimate_total: bool = False,
+        fields: Optional[Fields] = None,
+        filters: Optional[ProductFilters] = None,
     ) -> ProductListResponse:
         logger.debug(
-            f"Getting products - catalog_id: {catalog_id}, page: {page}, page_size: {page_size}"
+            "Getting products - catalog_id: %s, page: %s, page_size: %s",
+            catalog_id,
+            page,
+            page_size,
         )
 
         if catalog_id:
             catalog = await self.catalog_repository.get_by_id(catalog_id)
             if not catalog:
-                logger.warning(f"Catalog with id {catalog_id} not found")
+                logger.warning("Catalog with id %s not found", catalog_id)
                 raise NotFoundError("Catalog", catalog_id)
 
-            products, total = await self.product_repository.get_by_catalog_id(
-                catalog_id=catalog_id,
-                page=page,
+        filters = filters or ProductFilters()
+        sort_field = filters.sort.lstrip("-")
+
+        if include_total is None:
+            include_total = cursor is None
+        exact_total = include_total and not estimate_total
+
+        total = None
+        if cursor is not None:
+            products, has_more = await self.product_repository.get_page_after(
                 page_size=page_size,
+                after=decode_cursor(cursor, filters.sort) if cursor else None,
+                catalog_id=catalog_id,
+                fields=fields,
+                filters=filters,
             )
+            if exact_total:
+                total = await self.product_repository.count(catalog_id, filters)
         else:
-            products, total = await self.product_repository.get_all(
-                page=page,
-                page_size=page_size,
-            )
+            if catalog_id:
+                products, total = await self.product_repository.get_by_catalog_id(
+                    catalog_id=catalog_id,
+                    page=page,
+                    page_size=page_size,
+                    include_total=exact_total,
+                    fields=fields,
+                    filters=filters,
+                )
+            else:
+                products, total = await self.product_repository.get_all(
+                    page=page,
+                    page_size=page_size,
+                    include_total=exact_total,
+                    fields=fields,
+                    filters=filters,
+                )
+            if total is not None:
+                has_more = (page - 1) * page_size + len(products) < total
+            else:
+                has_more = len(products) == page_size
+
+        if include_total and estimate_total:
+            total = await self.product_repository.estimate_count(catalog_id, filters)
 
-        return ProductListResponse(
+        next_cursor = None
+        if has_more and products:
+            last = products[-1]
+            next_cursor = encode_cursor(getattr(last, sort_field), last.id, filters.sort)
+
+        list_model = list_response_model(
+            ProductListResponse, ProductResponse, fields, (sort_field,)
+        )
+        return list_model(
             items=products,
             total=total,
+            total_estimated=include_total and estimate_total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
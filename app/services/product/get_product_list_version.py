@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+import logging
+
+from app.repositories.product_repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GetProductListVersion:
+    def __init__(self, repository: ProductRepository) -> None:
+        self.repository = repository
+
+    async def execute(self, catalog_id: Optional[int] = None) -> tuple[Optional[datetime], int]:
+        logger.debug("Getting product list version - catalog_id: %s", catalog_id)
+        return await self.repository.get_version(catalog_id)
@@ -0,0 +1,47 @@
+from typing import Optional
+import logging
+
+from app.fieldsets import Fields, list_response_model
+from app.schemas.product import ProductListResponse, ProductResponse
+from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_repository import CatalogRepository
+from app.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class SearchProducts:
+    def __init__(
+        self, product_repository: ProductRepository, catalog_repository: CatalogRepository
+    ) -> None:
+        self.product_repository = product_repository
+        self.catalog_repository = catalog_repository
+
+    async def execute(
+        self,
+        query: str,
+        catalog_id: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 10,
+        include_total: bool = True,
+        fields: Optional[Fields] = None,
+    ) -> ProductListResponse:
+        logger.debug("Searching products - query: %r, catalog_id: %s", query, catalog_id)
+
+        if catalog_id:
+            catalog = await self.catalog_repository.get_by_id(catalog_id)
+            if not catalog:
+                logger.warning("Catalog with id %s not found", catalog_id)
+                raise NotFoundError("Catalog", catalog_id)
+
+        products, total = await self.product_repository.search(
+            query,
+            page=page,
+            page_size=page_size,
+            catalog_id=catalog_id,
+            include_total=include_total,
+            fields=fields,
+        )
+
+        list_model = list_response_model(ProductListResponse, ProductResponse, fields)
+        return list_model(items=products, total=total, page=page, page_size=page_size)
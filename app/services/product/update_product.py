@@ -1,38 +1,56 @@
 import logging
+from typing import Optional
 
+from app.cache import CacheBackend, product_key
 from app.schemas.product import ProductUpdate, ProductResponse
 from app.repositories.product_repository import ProductRepository
-from app.repositories.catalog_repository import CatalogRepository
-from app.exceptions import NotFoundError
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.exceptions import NotFoundError, translate_integrity_errors
 
 logger = logging.getLogger(__name__)
 
+# product fields that feed the catalog stats
+STATS_FIELDS = {"price", "quantity", "catalog_id"}
+
 
 class UpdateProduct:
     def __init__(
-        self, product_repository: ProductRepository, catalog_repository: CatalogRepository
+        self,
+        product_repository: ProductRepository,
+        stats_repository: CatalogStatsRepository,
+        cache: Optional[CacheBackend] = None,
     ) -> None:
         self.product_repository = product_repository
-        self.catalog_repository = catalog_repository
+        self.stats_repository = stats_repository
+        self.cache = cache
 
     async def execute(
         self,
         product_id: int,
         product_data: ProductUpdate,
     ) -> ProductResponse:
-        logger.info(f"Updating product with id: {product_id}")
-
-        product = await self.product_repository.get_by_id(product_id)
-        if not product:
-            logger.warning(f"Product with id {product_id} not found")
-            raise NotFoundError("Product", product_id)
+        logger.info("Updating product with id: %s", product_id)
 
         update_data = product_data.model_dump(exclude_unset=True)
 
-        if "catalog_id" in update_data and update_data["catalog_id"] is not None:
-            catalog = await self.catalog_repository.get_by_id(update_data["catalog_id"])
-            if not catalog:
-                logger.warning(f"Catalog with id {update_data['catalog_id']} not found")
-                raise NotFoundError("Catalog", update_data["catalog_id"])
+        previous: Optional[ProductResponse] = None
+        with translate_integrity_errors(
+            foreign_key=lambda: NotFoundError("Catalog", update_data["catalog_id"])
+        ):
+            if update_data.keys() & STATS_FIELDS:
+                # the old values come from the locked row, so its stats contribution is exact
+                versions = await self.product_repository.update_with_previous(
+                    product_id, product_data
+                )
+                previous, updated = versions or (None, None)
+            else:
+                updated = await self.product_repository.update(product_id, product_data)
+        if not updated:
+            logger.warning("Product with id %s not found", product_id)
+            raise NotFoundError("Product", product_id)
+        if previous is not None:
+            await self.stats_repository.apply(added=[updated], removed=[previous])
 
-        return await self.product_repository.update(product_id, product_data)
+        if self.cache is not None:
+            self.cache.delete(product_key(product_id))
+        return updated
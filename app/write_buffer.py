@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.schemas.product import ProductQuantityAdjust, ProductResponse
+
+logger = logging.getLogger(__name__)
+
+# "flush": callers wait until the batch holding their adjustment is committed
+# "buffer": callers return once the adjustment is queued; a crash loses what was not flushed
+Durability = Literal["flush", "buffer"]
+
+AdjustmentOutcome = ProductResponse | HTTPException
+Batch = dict[int, list["PendingAdjustment"]]
+FlushHandler = Callable[[Batch], Awaitable[dict[int, list[AdjustmentOutcome]]]]
+
+
+@dataclass
+class PendingAdjustment:
+    adjustment: ProductQuantityAdjust
+    future: Optional["asyncio.Future[ProductResponse]"] = None
+    attempts: int = 0
+
+
+@dataclass
+class WriteBufferStats:
+    pending_products: int
+    pending_adjustments: int
+    flushes: int
+    flushed_adjustments: int
+    failures: int
+    dropped_adjustments: int
+
+
+class QuantityWriteBuffer:
+    """Coalesces quantity adjustments per product and writes them behind the requests.
+
+    Adjustments are merged into one delta per product and handed to the flush handler every
+    ``flush_interval`` seconds, or as soon as ``max_pending`` adjustments are queued. Once
+    ``max_queued`` are waiting the buffer takes no more, and callers write directly. The
+    interval doubles with every failed flush in a row, and a queued-only adjustment is
+    dropped after ``max_attempts`` failed flushes.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        max_pending: int,
+        durability: Durability,
+        max_queued: int,
+        max_attempts: int,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.durability = durability
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.flushes = 0
+        self.flushed_adjustments = 0
+        self.failures = 0
+        self.dropped_adjustments = 0
+        self._failures_in_row = 0
+        self._pending: Batch = {}
+        self._depth = 0
+        self._handler: Optional[FlushHandler] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    def accepts(self, adjustment: ProductQuantityAdjust) -> bool:
+        if not self.running or self._depth >= self.max_queued:
+            return False
+        # without waiting for the flush there is nobody left to tell about a failed guard
+        return self.durability == "flush" or adjustment.allow_negative
+
+    def start(self, handler: FlushHandler) -> None:
+        logger.info(
+            "Starting quantity write buffer (interval %ss, max %s pending, %s queued, "
+            "durability %s)",
+            self.flush_interval,
+            self.max_pending,
+            self.max_queued,
+            self.durability,
+        )
+        self._handler = handler
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush loop and write out everything still queued."""
+        if self._task is None:
+            return
+        logger.info("Draining quantity write buffer (%s pending adjustments)", self._depth)
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def add(
+        self, product_id: int, adjustment: ProductQuantityAdjust
+    ) -> Optional[ProductResponse]:
+        """Queue an adjustment; with ``flush`` durability, wait for and return its result."""
+        future = None
+        if self.durability == "flush":
+            future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(product_id, []).append(PendingAdjustment(adjustment, future))
+        self._depth += 1
+        # while flushes fail, the backoff decides when to try again
+        if self._depth >= self.max_pending and not self._failures_in_row:
+            self._wake.set()
+        return None if future is None else await future
+
+    async def flush(self) -> int:
+        """Write out the queued adjustments now; returns how many were flushed."""
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            depth, self._depth = self._depth, 0
+            if not batch:
+                return 0
+            assert self._handler is not None, "flush handler not set, call start() first"
+
+            logger.debug("Flushing %s adjustments of %s products", depth, len(batch))
+            try:
+                outcomes = await self._handler(batch)
+            except Exception as error:
+                self.failures += 1
+                self._failures_in_row += 1
+                logger.exception("Flushing %s quantity adjustments failed", depth)
+                self._fail(batch, error)
+                return 0
+            self._failures_in_row = 0
+
+            for product_id, entries in batch.items():
+                for entry, outcome in zip(entries, outcomes[product_id], strict=True):
+                    if entry.future is not None and entry.future.done():
+                        continue  # the caller went away
+                    if entry.future is None:
+                        if isinstance(outcome, HTTPException):
+                            logger.warning(
+                                "Dropped adjustment of product %s: %s", product_id, outcome.detail
+                            )
+                    elif isinstance(outcome, HTTPException):
+                        entry.future.set_exception(outcome)
+                    else:
+                        entry.future.set_result(outcome)
+            self.flushes += 1
+            self.flushed_adjustments += depth
+            return depth
+
+    def _fail(self, batch: Batch, error: Exception) -> None:
+        # waiting callers learn about the failure; queued-only adjustments are retried
+        dropped = 0
+        for product_id, entries in batch.items():
+            retry = []
+            for entry in entries:
+                if entry.future is not None:
+                    if not entry.future.done():
+                        entry.future.set_exception(error)
+                    continue
+                entry.attempts += 1
+                if entry.attempts < self.max_attempts:
+                    retry.append(entry)
+                else:
+                    dropped += 1
+            if retry:
+                self._pending[product_id] = retry + self._pending.get(product_id, [])
+                self._depth += len(retry)
+        if dropped:
+            self.dropped_adjustments += dropped
+            logger.error(
+                "Dropped %s quantity adjustments after %s failed flushes",
+                dropped,
+                self.max_attempts,
+            )
+
+    def _interval(self) -> float:
+        return self.flush_interval * 2 ** min(self._failures_in_row, self.max_attempts)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self._interval())
+            self._wake.clear()
+            await self.flush()
+        # the loop left on close(): one last attempt for anything queued meanwhile
+        await self.flush()
+
+    def stats(self) -> WriteBufferStats:
+        return WriteBufferStats(
+            pending_products=len(self._pending),
+            pending_adjustments=self._depth,
+            flushes=self.flushes,
+            flushed_adjustments=self.flushed_adjustments,
+            failures=self.failures,
+            dropped_adjustments=self.dropped_adjustments,
+        )
+
+
+quantity_buffer = QuantityWriteBuffer(
+    flush_interval=settings.WRITE_BUFFER_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.WRITE_BUFFER_MAX_PENDING,
+    durability=settings.WRITE_BUFFER_DURABILITY,
+    max_queued=settings.WRITE_BUFFER_MAX_QUEUED,
+    max_attempts=settings.WRITE_BUFFER_MAX_ATTEMPTS,
+)
+
+
+def get_quantity_buffer() -> Optional[QuantityWriteBuffer]:
+    return quantity_buffer if quantity_buffer.running else None
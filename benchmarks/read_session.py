@@ -0,0 +1,95 @@
+"""Compare the latency of one product read through a transactional and a read-only session.
+
+* ``transaction``: the ``get_db`` path; the read runs between BEGIN and COMMIT.
+* ``read-only``: the ``get_read_db`` path; nothing to commit, and no BEGIN or COMMIT at all
+  on PostgreSQL, where the connection runs in autocommit.
+
+Both fetch a product by id through ``ProductRepository`` with a fresh session per request.
+Run from the repository root, against a temporary SQLite file by default or any database
+URL whose schema is migrated::
+
+    python -m benchmarks.read_session [--url postgresql+asyncpg://...] [--number 2000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, read_only_sessionmaker
+from app.models.product import Product
+from app.repositories.product_repository import ProductRepository
+from app.schemas.product import ProductCreate
+
+
+async def timed(request: Callable[[], Awaitable[None]], number: int) -> list[float]:
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await request()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(url: str, number: int, repeat: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    read_only_sessions = read_only_sessionmaker(engine)
+
+    async with sessions() as session:
+        product = await ProductRepository(session).create(
+            ProductCreate(name="Benchmark product", price=1.0, quantity=1)
+        )
+        await session.commit()
+
+    async def transaction() -> None:
+        async with sessions() as session:
+            await ProductRepository(session).get_by_id(product.id)
+            await session.commit()
+
+    async def read_only() -> None:
+        async with read_only_sessions() as session:
+            await ProductRepository(session).get_by_id(product.id)
+
+    try:
+        results: dict[str, list[float]] = {"transaction": [], "read-only": []}
+        for _ in range(repeat):
+            for name, request in (("transaction", transaction), ("read-only", read_only)):
+                results[name] += await timed(request, number)
+
+        medians = {}
+        for name, samples in results.items():
+            medians[name] = statistics.median(samples) * 1e6
+            p99 = statistics.quantiles(samples, n=100)[98] * 1e6
+            print(f"{name:>11}: {medians[name]:9.1f} us median, {p99:9.1f} us p99 per request")
+        saved = medians["transaction"] - medians["read-only"]
+        print(f"      saved: {saved:9.1f} us per request ({saved / medians['transaction']:.0%})")
+    finally:
+        async with sessions() as session:
+            await session.execute(delete(Product).where(Product.id == product.id))
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--number", type=int, default=2000, help="requests per timing run")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per session kind")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite+aiosqlite:///{Path(directory) / 'benchmark.db'}"
+        asyncio.run(run(url, args.number, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
 import pytest
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from httpx import AsyncClient, ASGITransport
 from typing import AsyncGenerator
 
 from app.main import app
-from app.database import get_db, Base
+from app.cache import count_cache, entity_cache
+from app.database import (
+    get_db,
+    get_read_db,
+    Base,
+    QueryStats,
+    enable_sqlite_foreign_keys,
+    instrument_queries,
+    track_queries,
+)
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -12,6 +23,8 @@ test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False,
 )
+enable_sqlite_foreign_keys(test_engine)
+instrument_queries(test_engine)
 
 TestSessionLocal = async_sessionmaker(
     test_engine,
@@ -41,12 +54,43 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 @pytest.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        # commits like get_db, so that work waiting for the commit runs in tests too
+        try:
+            yield db_session
+            await db_session.commit()
+        except Exception:
+            await db_session.rollback()
+            raise
+
+    async def override_get_read_db() -> AsyncGenerator[AsyncSession, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    count_cache.clear()
+    entity_cache.clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """Fail the test if the wrapped block runs more than ``max_queries`` SQL statements.
+
+    Usage: ``with query_budget(2): await client.get(...)``
+    """
+
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[QueryStats]:
+        with track_queries("test", record_statements=True) as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Expected at most {max_queries} queries, {stats.count} were executed:\n"
+            + "\n".join(stats.statements)
+        )
+
+    return budget
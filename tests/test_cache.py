@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import InvalidateOnCommit, LRUCache
+from app.schemas.catalog import CatalogResponse
+
+
+def _catalog(name: str) -> CatalogResponse:
+    now = datetime.now()
+    return CatalogResponse(id=1, name=name, created_at=now, updated_at=now)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.size == 2
+
+
+def test_lru_cache_evicts_by_size():
+    cache = LRUCache(maxsize=10, ttl=60, max_bytes=len(_catalog("a" * 50).model_dump_json()) * 2)
+    cache.set("a", _catalog("a"))
+    cache.set("b", _catalog("b" * 50))
+    cache.set("c", _catalog("c" * 50))
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    stats = cache.stats()
+    assert stats.size == 2
+    assert stats.bytes <= stats.max_bytes
+    assert stats.evictions == 1
+
+    cache.delete("b")
+    cache.set("c", _catalog("c"))
+    assert cache.stats().bytes == len(_catalog("c").model_dump_json())
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.stats().size == 0
+
+
+def test_lru_cache_delete_where():
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set(("product", 1), 1)
+    cache.set(("product", 2), 2)
+    cache.set(("catalog", 1), 1)
+
+    removed = cache.delete_where(lambda key, value: key[0] == "product" and value == 1)
+
+    assert removed == 1
+    assert cache.get(("product", 1)) is None
+    assert cache.get(("product", 2)) == 2
+    assert cache.get(("catalog", 1)) == 1
+
+
+async def test_invalidation_waits_for_commit(db_session: AsyncSession):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set(("product", 1), 1)
+    cache.set(("product", 2), 2)
+    invalidating = InvalidateOnCommit(cache, db_session)
+
+    await db_session.execute(text("SELECT 1"))
+    invalidating.delete(("product", 1))
+    assert cache.get(("product", 1)) == 1
+    await db_session.rollback()
+    assert cache.get(("product", 1)) == 1
+
+    await db_session.execute(text("SELECT 1"))
+    invalidating.delete(("product", 2))
+    assert cache.get(("product", 2)) == 2
+    await db_session.commit()
+    assert cache.get(("product", 1)) == 1
+    assert cache.get(("product", 2)) is None
@@ -0,0 +1,170 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.catalog_stats import CatalogStats
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+
+
+async def _stats(client: AsyncClient, catalog_id: int) -> dict:
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}/stats")
+    assert response.status_code == 200
+    data = response.json()
+    return {key: data[key] for key in ("product_count", "total_units", "inventory_value")}
+
+
+@pytest.mark.asyncio
+async def test_catalog_stats_follow_product_writes(client: AsyncClient):
+    first = (await client.post("/api/v1/catalogs", json={"name": "First"})).json()["id"]
+    second = (await client.post("/api/v1/catalogs", json={"name": "Second"})).json()["id"]
+    assert await _stats(client, first) == {
+        "product_count": 0,
+        "total_units": 0,
+        "inventory_value": 0,
+    }
+
+    product = (
+        await client.post(
+            "/api/v1/products",
+            json={"name": "Chair", "price": 10.0, "quantity": 3, "catalog_id": first},
+        )
+    ).json()
+    await client.post(
+        "/api/v1/products/bulk",
+        json=[
+            {"name": "Desk", "price": 100.0, "quantity": 1, "catalog_id": first},
+            {"name": "Lamp", "price": 5.0, "quantity": 2, "catalog_id": second},
+            {"name": "Loose", "price": 1.0, "quantity": 1},
+        ],
+    )
+    assert await _stats(client, first) == {
+        "product_count": 2,
+        "total_units": 4,
+        "inventory_value": 130.0,
+    }
+    assert await _stats(client, second) == {
+        "product_count": 1,
+        "total_units": 2,
+        "inventory_value": 10.0,
+    }
+
+    await client.put(f"/api/v1/products/{product['id']}", json={"quantity": 5})
+    assert (await _stats(client, first))["inventory_value"] == 150.0
+
+    await client.put(f"/api/v1/products/{product['id']}", json={"catalog_id": second})
+    assert await _stats(client, first) == {
+        "product_count": 1,
+        "total_units": 1,
+        "inventory_value": 100.0,
+    }
+    assert await _stats(client, second) == {
+        "product_count": 2,
+        "total_units": 7,
+        "inventory_value": 60.0,
+    }
+
+    await client.delete(f"/api/v1/products/{product['id']}")
+    assert await _stats(client, second) == {
+        "product_count": 1,
+        "total_units": 2,
+        "inventory_value": 10.0,
+    }
+
+    await client.delete(f"/api/v1/catalogs/{second}")
+    response = await client.get(f"/api/v1/catalogs/{second}/stats")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_catalogs_sorted_by_stats(client: AsyncClient):
+    values = {"Small": 1, "Large": 30, "Medium": 7, "Empty": 0}
+    for name, quantity in values.items():
+        catalog_id = (await client.post("/api/v1/catalogs", json={"name": name})).json()["id"]
+        if quantity:
+            await client.post(
+                "/api/v1/products",
+                json={"name": name, "price": 2.0, "quantity": quantity, "catalog_id": catalog_id},
+            )
+
+    response = await client.get("/api/v1/catalogs?sort=-inventory_value")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    items = response.json()["items"]
+    assert [item["name"] for item in items] == ["Large", "Medium", "Small", "Empty"]
+    assert [item["stats"]["inventory_value"] for item in items] == [60.0, 14.0, 2.0, 0.0]
+
+    names = []
+    url = "/api/v1/catalogs?sort=total_units&fields=name&page_size=3&cursor="
+    while url:
+        data = (await client.get(url)).json()
+        names += [item["name"] for item in data["items"]]
+        assert all(set(item) == {"name", "stats"} for item in data["items"])
+        next_cursor = data["next_cursor"]
+        url = next_cursor and f"/api/v1/catalogs?sort=total_units&fields=name&cursor={next_cursor}"
+    assert names == ["Empty", "Small", "Medium", "Large"]
+
+
+@pytest.mark.asyncio
+async def test_get_catalog_include_stats(client: AsyncClient):
+    catalog_id = (await client.post("/api/v1/catalogs", json={"name": "Catalog"})).json()["id"]
+    await client.post(
+        "/api/v1/products",
+        json={"name": "Chair", "price": 10.0, "quantity": 3, "catalog_id": catalog_id},
+    )
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}?include=stats&fields=name")
+    data = response.json()
+    assert data["name"] == "Catalog"
+    assert data["stats"]["total_units"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rebuild_catalog_stats(client: AsyncClient, db_session: AsyncSession):
+    catalog_id = (await client.post("/api/v1/catalogs", json={"name": "Catalog"})).json()["id"]
+    await client.post(
+        "/api/v1/products",
+        json={"name": "Chair", "price": 10.0, "quantity": 3, "catalog_id": catalog_id},
+    )
+    await db_session.execute(
+        update(CatalogStats).values(product_count=42, total_units=-1, inventory_value=7)
+    )
+
+    assert await CatalogStatsRepository(db_session).rebuild() == 1
+    assert await _stats(client, catalog_id) == {
+        "product_count": 1,
+        "total_units": 3,
+        "inventory_value": 30.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_adjustments_are_rolled_up(client: AsyncClient, db_session: AsyncSession):
+    catalog_id = (await client.post("/api/v1/catalogs", json={"name": "Catalog"})).json()["id"]
+    product = (
+        await client.post(
+            "/api/v1/products",
+            json={"name": "Chair", "price": 10.0, "quantity": 3, "catalog_id": catalog_id},
+        )
+    ).json()
+    for delta in (2, -1, 4):
+        await client.post(f"/api/v1/products/{product['id']}/adjust", json={"delta": delta})
+    # adjustments only record deltas, the stats row lags until the roll-up
+    assert (await _stats(client, catalog_id))["total_units"] == 3
+
+    repository = CatalogStatsRepository(db_session)
+    assert await repository.roll_up(2) == 2
+    assert (await _stats(client, catalog_id))["total_units"] == 4
+    assert await repository.roll_up(2) == 1
+    assert await repository.roll_up(2) == 0
+    assert await _stats(client, catalog_id) == {
+        "product_count": 1,
+        "total_units": 8,
+        "inventory_value": 80.0,
+    }
+
+    # a rebuild counts pending deltas in already, and discards them
+    await client.post(f"/api/v1/products/{product['id']}/adjust", json={"delta": -8})
+    assert await repository.rebuild(catalog_id) == 1
+    assert await repository.roll_up(100) == 0
+    assert (await _stats(client, catalog_id))["total_units"] == 0
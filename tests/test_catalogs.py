@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
 
+from app.config import settings
+from app.repositories.catalog_repository import CatalogRepository
+
 
 @pytest.mark.asyncio
 async def test_create_catalog(client: AsyncClient):
@@ -92,3 +95,229 @@ async def test_create_duplicate_catalog(client: AsyncClient):
         "/api/v1/catalogs", json={"name": "Test Catalog", "description": "Another Description"}
     )
     assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_get_catalogs_with_cursor(client: AsyncClient):
+    for i in range(3):
+        await client.post("/api/v1/catalogs", json={"name": f"Catalog {i}"})
+
+    first = (await client.get("/api/v1/catalogs?cursor=&page_size=2")).json()
+    assert len(first["items"]) == 2
+    assert first["total"] is None
+    assert first["next_cursor"]
+
+    second = (
+        await client.get(f"/api/v1/catalogs?page_size=2&cursor={first['next_cursor']}")
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_catalogs_estimated_total(client: AsyncClient):
+    await client.post("/api/v1/catalogs", json={"name": "Test Catalog"})
+
+    response = await client.get("/api/v1/catalogs?estimate_total=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["total_estimated"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_catalog_conditional(client: AsyncClient):
+    create_response = await client.post("/api/v1/catalogs", json={"name": "Test Catalog"})
+    catalog_id = create_response.json()["id"]
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}")
+    etag = response.headers["etag"]
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.get("/api/v1/catalogs")
+    list_etag = response.headers["etag"]
+    response = await client.get("/api/v1/catalogs", headers={"If-None-Match": list_etag})
+    assert response.status_code == 304
+
+    response = await client.get("/api/v1/catalogs?page=2", headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_nonexistent_catalog(client: AsyncClient):
+    response = await client.put("/api/v1/catalogs/99999", json={"name": "Missing"})
+    assert response.status_code == 404
+
+    response = await client.delete("/api/v1/catalogs/99999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_catalog_removes_products(client: AsyncClient):
+    create_response = await client.post("/api/v1/catalogs", json={"name": "Test Catalog"})
+    catalog_id = create_response.json()["id"]
+    for i in range(3):
+        await client.post(
+            "/api/v1/products",
+            json={"name": f"Product {i}", "price": 10.0, "catalog_id": catalog_id},
+        )
+
+    response = await client.delete(f"/api/v1/catalogs/{catalog_id}")
+    assert response.status_code == 204
+
+    products = (await client.get("/api/v1/products")).json()
+    assert products["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_catalog_in_chunks_without_cascade(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    async def no_cascade(self: CatalogRepository) -> bool:
+        return False
+
+    monkeypatch.setattr(CatalogRepository, "_cascades_deletes", no_cascade)
+    monkeypatch.setattr(settings, "CATALOG_DELETE_CHUNK_SIZE", 2)
+
+    create_response = await client.post("/api/v1/catalogs", json={"name": "Test Catalog"})
+    catalog_id = create_response.json()["id"]
+    for i in range(5):
+        await client.post(
+            "/api/v1/products",
+            json={"name": f"Product {i}", "price": 10.0, "catalog_id": catalog_id},
+        )
+    await client.post("/api/v1/products", json={"name": "Other Product", "price": 10.0})
+
+    response = await client.delete(f"/api/v1/catalogs/{catalog_id}")
+    assert response.status_code == 204
+
+    products = (await client.get("/api/v1/products")).json()
+    assert [item["name"] for item in products["items"]] == ["Other Product"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_endpoints_query_budget(client: AsyncClient, query_budget):
+    for i in range(5):
+        await client.post("/api/v1/catalogs", json={"name": f"Catalog {i}"})
+    catalog_id = (await client.get("/api/v1/catalogs")).json()["items"][0]["id"]
+
+    # list version, count and page
+    with query_budget(3):
+        await client.get("/api/v1/catalogs")
+    with query_budget(1):
+        await client.get(f"/api/v1/catalogs/{catalog_id}")
+
+
+@pytest.mark.asyncio
+async def test_catalogs_sparse_fields(client: AsyncClient):
+    create_response = await client.post(
+        "/api/v1/catalogs", json={"name": "Test Catalog", "description": "Test Description"}
+    )
+    catalog_id = create_response.json()["id"]
+
+    response = await client.get("/api/v1/catalogs?fields=id,name")
+    assert response.json()["items"] == [{"id": catalog_id, "name": "Test Catalog"}]
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}?fields=description")
+    assert response.json() == {"description": "Test Description"}
+
+
+@pytest.mark.asyncio
+async def test_batch_get_catalogs(client: AsyncClient, query_budget):
+    ids = []
+    for i in range(3):
+        response = await client.post("/api/v1/catalogs", json={"name": f"Catalog {i}"})
+        ids.append(response.json()["id"])
+
+    with query_budget(1):
+        response = await client.post(
+            "/api/v1/catalogs:batchGet?fields=id,name", json={"ids": [ids[1], 999999, ids[0]]}
+        )
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [{"id": ids[1], "name": "Catalog 1"}, {"id": ids[0], "name": "Catalog 0"}],
+        "missing": [999999],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_catalog_include_products(client: AsyncClient):
+    catalog_id = (await client.post("/api/v1/catalogs", json={"name": "Catalog"})).json()["id"]
+    for i in range(3):
+        await client.post(
+            "/api/v1/products",
+            json={"name": f"Product {i}", "price": 1.0, "catalog_id": catalog_id},
+        )
+
+    response = await client.get(
+        f"/api/v1/catalogs/{catalog_id}?include=products,product_count&products_limit=2"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["product_count"] == 3
+    assert [product["name"] for product in data["products"]] == ["Product 2", "Product 1"]
+    assert "etag" not in response.headers
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}?fields=name&include=product_count")
+    assert response.json() == {"name": "Catalog", "product_count": 3}
+
+    response = await client.get(f"/api/v1/catalogs/{catalog_id}")
+    assert "products" not in response.json()
+    assert "product_count" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_get_catalogs_include_unknown(client: AsyncClient):
+    response = await client.get("/api/v1/catalogs?include=orders")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_catalogs_include_query_count_is_constant(client: AsyncClient, query_budget):
+    async def create_catalogs(count: int, offset: int) -> None:
+        for i in range(offset, offset + count):
+            catalog_id = (
+                await client.post("/api/v1/catalogs", json={"name": f"Catalog {i}"})
+            ).json()["id"]
+            for j in range(i % 3):
+                await client.post(
+                    "/api/v1/products",
+                    json={"name": f"Product {i}-{j}", "price": 1.0, "catalog_id": catalog_id},
+                )
+
+    url = "/api/v1/catalogs?include=products,product_count&page_size=20"
+    await create_catalogs(2, 0)
+    # count, page, product counts, products
+    with query_budget(4) as small_page:
+        await client.get(url)
+
+    await create_catalogs(10, 2)
+    with query_budget(4) as large_page:
+        response = await client.get(url)
+    assert large_page.count == small_page.count
+
+    items = response.json()["items"]
+    assert len(items) == 12
+    for item in items:
+        expected = int(item["name"].split()[-1]) % 3
+        assert item["product_count"] == expected
+        assert len(item["products"]) == expected
+
+
+@pytest.mark.asyncio
+async def test_catalog_name_conflicts_come_from_the_unique_index(client: AsyncClient, query_budget):
+    await client.post("/api/v1/catalogs", json={"name": "Taken"})
+    other_id = (await client.post("/api/v1/catalogs", json={"name": "Other"})).json()["id"]
+
+    # the INSERT or UPDATE runs straight away, no name lookup first
+    with query_budget(1):
+        response = await client.post("/api/v1/catalogs", json={"name": "Taken"})
+    assert response.status_code == 409
+    with query_budget(1):
+        response = await client.put(f"/api/v1/catalogs/{other_id}", json={"name": "Taken"})
+    assert response.status_code == 409
+
+    response = await client.put(f"/api/v1/catalogs/{other_id}", json={"name": "Other"})
+    assert response.status_code == 200
@@ -0,0 +1,19 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_health(client: AsyncClient):
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_database_and_pool(client: AsyncClient):
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["database"]["status"] == "ok"
+    assert {"waits", "timeouts", "wait_seconds_max"} <= data["pool"].keys()
@@ -0,0 +1,43 @@
+import json
+import logging
+import queue
+
+from app.logging_config import DeferredQueueHandler, JsonFormatter, SamplingFilter
+
+
+def _record(name: str, level: int, msg: str = "message", *args: object) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record("app.test", logging.INFO, "Product %s created", 7)
+    record.product_id = 7
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "Product 7 created"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.test"
+    assert payload["product_id"] == 7
+    assert "timestamp" in payload
+
+
+def test_sampling_filter_drops_only_sampled_info_records():
+    sampling = SamplingFilter({"app.repositories": 0.0, "app.repositories.catalog": 1.0})
+
+    assert not sampling.filter(_record("app.repositories.product", logging.INFO))
+    assert not sampling.filter(_record("app.repositories.product", logging.DEBUG))
+    assert sampling.filter(_record("app.repositories.product", logging.WARNING))
+    assert sampling.filter(_record("app.repositories.catalog", logging.INFO))
+    assert sampling.filter(_record("app.services.get_product", logging.INFO))
+
+
+def test_deferred_queue_handler_leaves_formatting_to_listener():
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+
+    handler.handle(_record("app.test", logging.INFO, "Fetched %s products", 3))
+
+    queued = log_queue.get_nowait()
+    assert queued.msg == "Fetched %s products"
+    assert queued.args == (3,)
@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import track_queries
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    create_response = await client.post(
+        "/api/v1/products", json={"name": "Test Product", "price": 10.0}
+    )
+    product_id = create_response.json()["id"]
+    await client.get(f"/api/v1/products/{product_id}")
+    await client.get("/api/v1/products/99999")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/v1/products/{product_id}",'
+        'status="200"}' in body
+    )
+    assert 'route="/api/v1/products/{product_id}",status="404"' in body
+    assert 'db_operation_duration_seconds_count{operation="ProductRepository.create"}' in body
+    assert 'http_requests_in_progress{method="GET"}' in body
+    assert 'cache_hits_total{cache="entity"}' in body
+
+
+@pytest.mark.asyncio
+async def test_query_stats_headers_in_debug(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    response = await client.get("/api/v1/products")
+    assert "X-DB-Queries" not in response.headers
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    response = await client.get("/api/v1/products")
+    assert int(response.headers["X-DB-Queries"]) >= 1
+    assert float(response.headers["X-DB-Time"]) >= 0
+
+
+@pytest.mark.asyncio
+async def test_query_text_only_kept_when_recorded(db_session: AsyncSession):
+    with track_queries("request") as counted, track_queries(record_statements=True) as recorded:
+        await db_session.execute(text("SELECT 1"))
+    assert counted.count == recorded.count == 1
+    assert counted.statements == []
+    assert recorded.statements == ["SELECT 1"]
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_SECONDS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.database"):
+        await client.get("/api/v1/products")
+
+    assert any(
+        "Slow query" in record.message and "GET /api/v1/products" in record.message
+        for record in caplog.records
+    )
@@ -0,0 +1,172 @@
+"""Plan regression tests: every list/detail query must be answered from an index.
+
+Each case runs a repository method against a seeded and ANALYZEd database, captures the
+SELECTs it issues and fails if ``EXPLAIN QUERY PLAN`` reports a full table scan or a
+separate sort step for any of them. Search results are ordered by relevance, which no index
+holds, so search cases may sort the matching rows.
+"""
+
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import Base
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.repositories.product_repository import ProductRepository
+from app.schemas.catalog import CatalogCreate
+from app.schemas.product import ProductCreate, ProductFilters
+from tests.conftest import test_engine
+
+CATALOGS = 50
+PRODUCTS_PER_CATALOG = 40
+AFTER = (datetime(2030, 1, 1, tzinfo=timezone.utc), 10**9)
+
+# scans of subquery results (anon_1, ...) are fine; scans of whole tables are not
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(Base.metadata.tables)})$")
+SORT_STEP = "USE TEMP B-TREE FOR ORDER BY"
+RANKED = {"products search", "products of catalog search"}
+
+Case = Callable[[ProductRepository, CatalogRepository], Awaitable[Any]]
+
+CASES: dict[str, Case] = {
+    "product by id": lambda products, _: products.get_by_id(1),
+    "products by ids": lambda products, _: products.get_by_ids([3, 1, 2]),
+    "products newest first": lambda products, _: products.get_all(),
+    "products of catalog": lambda products, _: products.get_by_catalog_id(1),
+    "products in stock": lambda products, _: products.get_all(
+        filters=ProductFilters(in_stock=True), include_total=False
+    ),
+    "products of catalog in stock": lambda products, _: products.get_by_catalog_id(
+        1, filters=ProductFilters(in_stock=True), include_total=False
+    ),
+    "products name prefix": lambda products, _: products.get_all(
+        filters=ProductFilters(name_prefix="Product 1"), include_total=False
+    ),
+    "product counts of catalogs": lambda products, _: products.count_by_catalog_ids([1, 2, 3]),
+    "latest products of catalogs": lambda products, _: products.get_latest_by_catalog_ids(
+        [1, 2, 3], 5
+    ),
+    "products page after": lambda products, _: products.get_page_after(after=AFTER),
+    "products of catalog page after": lambda products, _: products.get_page_after(
+        after=AFTER, catalog_id=1
+    ),
+    **{
+        f"products sort={sort}": (
+            lambda products, _, sort=sort: products.get_all(
+                filters=ProductFilters(sort=sort), include_total=False
+            )
+        )
+        for sort in ("price", "-price", "name", "-name", "quantity", "-quantity")
+    },
+    **{
+        f"products of catalog sort={sort}": (
+            lambda products, _, sort=sort: products.get_page_after(
+                catalog_id=1, filters=ProductFilters(sort=sort)
+            )
+        )
+        for sort in ("price", "-name", "quantity")
+    },
+    "products count": lambda products, _: products.count(),
+    "products of catalog count": lambda products, _: products.count(1),
+    "products in stock count": lambda products, _: products.count(
+        filters=ProductFilters(in_stock=True)
+    ),
+    "products estimated count": lambda products, _: products.estimate_count(),
+    "products of catalog estimated count": lambda products, _: products.estimate_count(1),
+    "products version": lambda products, _: products.get_version(),
+    "products of catalog version": lambda products, _: products.get_version(1),
+    "products search": lambda products, _: products.search("product"),
+    "products of catalog search": lambda products, _: products.search("product", catalog_id=1),
+    "catalog by id": lambda _, catalogs: catalogs.get_by_id(1),
+    "catalogs count": lambda _, catalogs: catalogs.count(),
+    "catalogs estimated count": lambda _, catalogs: catalogs.estimate_count(),
+    "catalogs version": lambda _, catalogs: catalogs.get_version(),
+    "existing catalogs": lambda _, catalogs: catalogs.get_existing_ids([3, 1, 2]),
+    "catalog stats": lambda _, catalogs: CatalogStatsRepository(catalogs.session).get(1),
+    "stats of catalogs": lambda _, catalogs: CatalogStatsRepository(
+        catalogs.session
+    ).get_by_catalog_ids([3, 1, 2]),
+    "products export": lambda products, _: drain(products.stream_rows()),
+    "products of catalog export": lambda products, _: drain(products.stream_rows(1)),
+    "catalogs by ids": lambda _, catalogs: catalogs.get_by_ids([3, 1, 2]),
+    "catalogs newest first": lambda _, catalogs: catalogs.get_all(include_total=False),
+    "catalogs page after": lambda _, catalogs: catalogs.get_page_after(after=AFTER),
+    **{
+        f"catalogs sort={sort}": (
+            lambda _, catalogs, sort=sort: catalogs.get_page_after(after=(10**9, 10**9), sort=sort)
+        )
+        for sort in ("-product_count", "total_units", "-inventory_value")
+    },
+}
+
+
+async def drain(chunks: AsyncIterator[Any]) -> None:
+    async for _ in chunks:
+        pass
+
+
+@contextmanager
+def capture_selects() -> Iterator[list[tuple[str, Any]]]:
+    captured: list[tuple[str, Any]] = []
+
+    def _record(_conn: Any, _cursor: Any, statement: str, parameters: Any, *_args: Any) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        yield captured
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> list[str]:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in result.all()]
+
+
+@pytest.fixture
+async def seeded_session(db_session: AsyncSession) -> AsyncSession:
+    catalogs = CatalogRepository(db_session)
+    stats = CatalogStatsRepository(db_session)
+    for catalog_number in range(CATALOGS):
+        catalog = await catalogs.create(CatalogCreate(name=f"Catalog {catalog_number}"))
+        await stats.create(catalog.id)
+        products = [
+            ProductCreate(
+                name=f"Product {catalog_number}-{number}",
+                price=1 + number % 50,
+                quantity=number % 7,
+                catalog_id=catalog.id,
+            )
+            for number in range(PRODUCTS_PER_CATALOG - catalog_number)
+        ]
+        await ProductRepository(db_session).bulk_create(products)
+        await stats.apply(added=products)
+    connection = await db_session.connection()
+    await connection.exec_driver_sql("ANALYZE")
+    return db_session
+
+
+@pytest.mark.parametrize("name", CASES.keys())
+async def test_query_is_served_by_an_index(seeded_session: AsyncSession, name: str):
+    with capture_selects() as captured:
+        await CASES[name](ProductRepository(seeded_session), CatalogRepository(seeded_session))
+    assert captured
+
+    for statement, parameters in captured:
+        plan = await explain(seeded_session, statement, parameters)
+        regressions = [
+            step
+            for step in plan
+            if FULL_SCAN.match(step) or (step == SORT_STEP and name not in RANKED)
+        ]
+        assert not regressions, f"{statement}\nplan: {plan}"
@@ -0,0 +1,201 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.exceptions import ConflictError, NotFoundError
+from app.main import app
+from app.repositories.catalog_stats_repository import CatalogStatsRepository
+from app.repositories.product_repository import ProductRepository
+from app.schemas.product import ProductQuantityAdjust
+from app.services.product import FlushQuantityAdjustments
+from app.write_buffer import (
+    AdjustmentOutcome,
+    Batch,
+    Durability,
+    QuantityWriteBuffer,
+    get_quantity_buffer,
+)
+
+BufferFactory = Callable[..., QuantityWriteBuffer]
+
+
+@pytest.fixture
+async def make_buffer(db_session: AsyncSession) -> AsyncIterator[BufferFactory]:
+    """Start buffers that flush into the test session; they are drained after the test."""
+    buffers: list[QuantityWriteBuffer] = []
+
+    def make(
+        durability: Durability = "flush",
+        max_pending: int = 1000,
+        flush_interval: float = 60,
+        failing_flushes: int = 0,
+        max_queued: int = 10000,
+        max_attempts: int = 5,
+    ) -> QuantityWriteBuffer:
+        failures = failing_flushes
+
+        async def handler(batch: Batch) -> dict[int, list[AdjustmentOutcome]]:
+            nonlocal failures
+            if failures:
+                failures -= 1
+                raise RuntimeError("database unavailable")
+            service = FlushQuantityAdjustments(
+                ProductRepository(db_session), CatalogStatsRepository(db_session)
+            )
+            return await service.execute(batch)
+
+        buffer = QuantityWriteBuffer(
+            flush_interval, max_pending, durability, max_queued, max_attempts
+        )
+        buffer.start(handler)
+        buffers.append(buffer)
+        return buffer
+
+    yield make
+    for buffer in buffers:
+        await buffer.close()
+
+
+async def _product(client: AsyncClient, quantity: int, catalog_id: int | None = None) -> int:
+    response = await client.post(
+        "/api/v1/products",
+        json={"name": "Widget", "price": 2.0, "quantity": quantity, "catalog_id": catalog_id},
+    )
+    return response.json()["id"]
+
+
+def _adjust(delta: int, allow_negative: bool = False) -> ProductQuantityAdjust:
+    return ProductQuantityAdjust(delta=delta, allow_negative=allow_negative)
+
+
+@pytest.mark.asyncio
+async def test_buffer_coalesces_adjustments(
+    client: AsyncClient, db_session: AsyncSession, make_buffer, query_budget
+):
+    catalog_id = (await client.post("/api/v1/catalogs", json={"name": "Sale"})).json()["id"]
+    hot = await _product(client, 100, catalog_id)
+    other = await _product(client, 5, catalog_id)
+    buffer = make_buffer()
+
+    waiting = [asyncio.create_task(buffer.add(hot, _adjust(-1))) for _ in range(20)]
+    waiting.append(asyncio.create_task(buffer.add(other, _adjust(3))))
+    await asyncio.sleep(0)
+    assert buffer.stats().pending_products == 2
+    assert buffer.stats().pending_adjustments == 21
+
+    # one UPDATE for every product in the batch, one INSERT of the catalog stats delta
+    with query_budget(2) as stats:
+        assert await buffer.flush() == 21
+    assert stats.statements[0].lstrip().upper().startswith("UPDATE")
+
+    results = await asyncio.gather(*waiting)
+    assert {result.quantity for result in results[:-1]} == {80}
+    assert results[-1].quantity == 8
+    assert buffer.stats().pending_adjustments == 0
+    assert buffer.stats().flushed_adjustments == 21
+
+    assert await CatalogStatsRepository(db_session).roll_up(100) == 1
+    catalog_stats = (await client.get(f"/api/v1/catalogs/{catalog_id}/stats")).json()
+    assert catalog_stats["total_units"] == 88
+    assert catalog_stats["inventory_value"] == 176.0
+
+
+@pytest.mark.asyncio
+async def test_buffer_replays_product_that_fails_guard(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 2)
+    buffer = make_buffer()
+
+    waiting = [asyncio.create_task(buffer.add(product_id, _adjust(delta))) for delta in (-1, -5, 1)]
+    missing = asyncio.create_task(buffer.add(999999, _adjust(1)))
+    await asyncio.sleep(0)
+    await buffer.flush()
+
+    first, second, third = await asyncio.gather(*waiting, return_exceptions=True)
+    assert first.quantity == 1
+    assert isinstance(second, ConflictError)
+    assert third.quantity == 2
+    with pytest.raises(NotFoundError):
+        await missing
+
+
+@pytest.mark.asyncio
+async def test_buffer_without_waiting_retries_failed_flush(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 0)
+    buffer = make_buffer(durability="buffer", failing_flushes=1)
+    # guarded adjustments need an answer, so they are never queued without waiting
+    assert not buffer.accepts(_adjust(-1))
+    assert buffer.accepts(_adjust(-1, allow_negative=True))
+
+    assert await buffer.add(product_id, _adjust(4, allow_negative=True)) is None
+    assert await buffer.flush() == 0
+    assert buffer.stats().failures == 1
+    assert buffer.stats().pending_adjustments == 1
+
+    await buffer.add(product_id, _adjust(1, allow_negative=True))
+    await buffer.close()
+    assert buffer.stats().pending_adjustments == 0
+    response = await client.get(f"/api/v1/products/{product_id}")
+    assert response.json()["quantity"] == 5
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_adjustment_after_max_attempts(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 0)
+    buffer = make_buffer(durability="buffer", failing_flushes=2, max_attempts=2)
+
+    await buffer.add(product_id, _adjust(4, allow_negative=True))
+    await buffer.flush()
+    assert buffer.stats().pending_adjustments == 1
+    await buffer.flush()
+    assert buffer.stats().pending_adjustments == 0
+    assert buffer.stats().dropped_adjustments == 1
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_falls_through_to_direct_update(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 0)
+    buffer = make_buffer(durability="buffer", max_queued=2)
+    app.dependency_overrides[get_quantity_buffer] = lambda: buffer
+
+    url = f"/api/v1/products/{product_id}/adjust"
+    body = {"delta": 1, "allow_negative": True}
+    statuses = [(await client.post(url, json=body)).status_code for _ in range(3)]
+    assert statuses == [202, 202, 200]
+    assert buffer.stats().pending_adjustments == 2
+
+    await buffer.flush()
+    assert (await client.post(url, json=body)).status_code == 202
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_at_size_threshold(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 10)
+    buffer = make_buffer(max_pending=3)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(buffer.add(product_id, _adjust(-2)) for _ in range(3))), timeout=5
+    )
+    assert [result.quantity for result in results] == [4, 4, 4]
+    assert buffer.stats().flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_adjust_endpoint_queues_in_buffer(client: AsyncClient, make_buffer):
+    product_id = await _product(client, 1)
+    buffer = make_buffer(durability="buffer")
+    app.dependency_overrides[get_quantity_buffer] = lambda: buffer
+
+    response = await client.post(
+        f"/api/v1/products/{product_id}/adjust", json={"delta": -3, "allow_negative": True}
+    )
+    assert response.status_code == 202
+    # guarded adjustments bypass a buffer that does not wait for the flush
+    response = await client.post(f"/api/v1/products/{product_id}/adjust", json={"delta": -3})
+    assert response.status_code == 409
+
+    await buffer.flush()
+    response = await client.get(f"/api/v1/products/{product_id}")
+    assert response.json()["quantity"] == -2